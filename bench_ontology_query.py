@@ -0,0 +1,125 @@
+# bench_ontology_query.py
+#
+# Compares the compiled OntologyQuery layer with the original per-call
+# Graph.value lookups on synthetic ontologies. "Fresh" timings build a new
+# OntologyQuery inside the timed call, as the GUI does after every ontology
+# load, so they include the compile cost.
+# Usage: python bench_ontology_query.py [--functions 10000] [--steps 10000] [--repeat 5]
+
+import argparse
+import time
+from rdflib import Graph, Literal, Namespace, RDF, RDFS
+
+from ontology_query import OntologyQuery
+
+NAMESPACE_URI = "http://www.example.org/synthetic_ontology#"
+
+def build_graph(function_count, step_count):
+    EX = Namespace(NAMESPACE_URI)
+    graph = Graph()
+    appliance = EX.appliance
+    graph.add((appliance, RDF.type, EX.Appliance))
+    for i in range(function_count):
+        function_uri = EX[f"function{i}"]
+        graph.add((function_uri, RDF.type, EX.Function))
+        graph.add((function_uri, RDFS.label, Literal(f"Function {i}")))
+        graph.add((function_uri, EX.implements_mp, Literal("press_button")))
+        graph.add((appliance, EX.hasFunction, function_uri))
+    for i in range(step_count):
+        step_uri = EX[f"step{i}"]
+        graph.add((step_uri, RDF.type, EX.Step))
+        graph.add((step_uri, EX.isFunctionOf, EX[f"function{i % max(1, function_count)}"]))
+        if i + 1 < step_count:
+            graph.add((step_uri, EX.nextStep, EX[f"step{i + 1}"]))
+    if step_count:
+        graph.add((appliance, EX.hasStep, EX.step0))
+    return graph, EX, appliance
+
+# The reader's original implementation, kept here as the baseline
+
+def legacy_functions(graph, appliance_uri, namespace):
+    functions_list = []
+    for s, p, o in graph.triples((appliance_uri, namespace.hasFunction, None)):
+        function_label = graph.value(o, RDFS.label)
+        implements_mp_value = graph.value(o, namespace.implements_mp)
+        functions_list.append({
+            "name": str(function_label) if function_label else str(o).split('#')[-1],
+            "implements_mp": str(implements_mp_value) if implements_mp_value else "None",
+            "uri": o
+        })
+    return functions_list
+
+def legacy_step(graph, step_uri, namespace):
+    function_uri = graph.value(step_uri, namespace.isFunctionOf)
+    if function_uri:
+        function_label = graph.value(function_uri, RDFS.label)
+        implements_mp_value = graph.value(function_uri, namespace.implements_mp)
+        return {
+            "step_uri": step_uri,
+            "function_name": str(function_label) if function_label else str(function_uri).split('#')[-1],
+            "implements_mp": str(implements_mp_value) if implements_mp_value else "None",
+        }
+    return None
+
+def legacy_steps(graph, appliance_uri, namespace):
+    steps = []
+    step = legacy_step(graph, graph.value(appliance_uri, namespace.hasStep), namespace)
+    while step:
+        steps.append(step)
+        next_step_uri = graph.value(step["step_uri"], namespace.nextStep)
+        step = legacy_step(graph, next_step_uri, namespace) if next_step_uri else None
+    return steps
+
+def best_of(repeat, fn):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OntologyQuery against the original reader.")
+    parser.add_argument("--functions", type=int, default=10000)
+    parser.add_argument("--steps", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Building synthetic ontology: {args.functions} functions, {args.steps} steps...")
+    graph, EX, appliance = build_graph(args.functions, args.steps)
+    print(f"{len(graph)} triples.")
+
+    legacy_f_time, legacy_f = best_of(args.repeat, lambda: legacy_functions(graph, appliance, EX))
+    fresh_f_time, fresh_f = best_of(args.repeat, lambda: OntologyQuery(graph, EX).functions(appliance))
+    query = OntologyQuery(graph, EX)
+    query.functions(appliance)
+    repeat_f_time, _ = best_of(args.repeat, lambda: query.functions(appliance))
+
+    legacy_s_time, legacy_s = best_of(args.repeat, lambda: legacy_steps(graph, appliance, EX))
+    fresh_s_time, fresh_s = best_of(args.repeat, lambda: OntologyQuery(graph, EX).steps(appliance))
+
+    # What one ontology load costs the GUI: list the functions and walk the step chain
+    legacy_load_time, _ = best_of(args.repeat, lambda: (legacy_functions(graph, appliance, EX), legacy_steps(graph, appliance, EX)))
+
+    def fresh_load():
+        load_query = OntologyQuery(graph, EX)
+        return load_query.functions(appliance), load_query.steps(appliance)
+    fresh_load_time, _ = best_of(args.repeat, fresh_load)
+
+    assert [(f["name"], f["implements_mp"], f["uri"]) for f in legacy_f] == [(f.name, f.implements_mp, f.uri) for f in fresh_f]
+    assert legacy_s == [s.as_step() for s in fresh_s]
+
+    rows = [
+        ("functions", legacy_f_time, fresh_f_time),
+        ("step list", legacy_s_time, fresh_s_time),
+        ("functions + step list", legacy_load_time, fresh_load_time),
+        ("functions, repeat listing", legacy_f_time, repeat_f_time),
+    ]
+    print(f"  {'':<28}{'legacy':>10}{'compiled':>12}{'speed-up':>10}")
+    for name, legacy_time, compiled_time in rows:
+        print(f"  {name:<28}{legacy_time * 1000:8.1f} ms{compiled_time * 1000:9.1f} ms{legacy_time / compiled_time:9.1f}x")
+    print("  The first three rows include building the OntologyQuery; the last reuses a compiled one.")
+
+if __name__ == "__main__":
+    main()
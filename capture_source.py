@@ -0,0 +1,203 @@
+# capture_source.py
+
+import threading
+import time
+import cv2
+
+NETWORK_PREFIXES = ("http://", "https://", "rtsp://", "rtmp://", "udp://", "tcp://")
+
+class CaptureSource:
+    """
+    Wraps cv2.VideoCapture with a background grab loop for live sources.
+
+    The grab thread keeps calling cap.grab(), which pulls the next packet off
+    the stream without decoding it, so the driver's buffer never holds stale
+    frames. It only calls cap.retrieve() when read() asks for a frame, so
+    decoding happens off the caller's thread and only for frames that are
+    used. Dropped connections are reopened with exponential backoff instead
+    of ending the stream.
+
+    With loop=True a recorded video is replayed endlessly at its own frame
+    rate, standing in for a camera (used by the soak test).
+    """
+
+    def __init__(self, source, live=None, reconnect_delay=0.5, max_reconnect_delay=8.0,
+                 max_failures=5, fps_smoothing=0.1, loop=False):
+        self.source = source
+        # Recorded video files must be read frame by frame, never skipped
+        self.live = live if live is not None else self._is_live_source(source)
+        self.loop = loop and not self.live
+        self.next_frame_time = None
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_failures = max_failures
+        self.fps_smoothing = fps_smoothing
+
+        self.frame_ready = threading.Condition()
+        self.frame_wanted = threading.Event()
+        self.stop_event = threading.Event()
+        self.grab_thread = None
+        self.latest_frame = None
+        self.frame_seq = 0
+
+        self.grab_count = 0
+        self.decoded_count = 0
+        self.reconnect_count = 0
+        self.fps = 0.0
+        self.last_grab_time = None
+        self.connected = False
+
+        self.cap = self._open()
+
+    @staticmethod
+    def _is_live_source(source):
+        if isinstance(source, int):
+            return True
+        source = str(source)
+        return source.isdigit() or source.lower().startswith(NETWORK_PREFIXES)
+
+    def _open(self):
+        cap = cv2.VideoCapture(self.source)
+        if cap.isOpened():
+            # Keep the driver-side queue as short as the backend allows
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            self.connected = True
+        return cap
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def start(self):
+        if not self.live or self.grab_thread is not None:
+            return
+        self.grab_thread = threading.Thread(target=self._grab_loop, name="CaptureGrabThread", daemon=True)
+        self.grab_thread.start()
+
+    def _grab_loop(self):
+        failures = 0
+        delay = self.reconnect_delay
+        while not self.stop_event.is_set():
+            # Only this thread touches the capture object while it is running
+            ok = self.cap is not None and self.cap.isOpened() and self.cap.grab()
+            if ok:
+                failures = 0
+                delay = self.reconnect_delay
+                self._record_grab()
+                if self.frame_wanted.is_set():
+                    ret, frame = self.cap.retrieve()
+                    if ret:
+                        with self.frame_ready:
+                            self.latest_frame = frame
+                            self.frame_seq += 1
+                            self.decoded_count += 1
+                            self.frame_wanted.clear()
+                            self.frame_ready.notify_all()
+                continue
+
+            failures += 1
+            if failures < self.max_failures:
+                time.sleep(0.01)
+                continue
+
+            print(f"Capture source '{self.source}' lost, reconnecting in {delay:.1f}s...")
+            self.connected = False
+            if self.stop_event.wait(delay):
+                break
+            self._reconnect()
+            delay = min(delay * 2, self.max_reconnect_delay)
+            failures = 0
+
+        # The capture is released here, by the only thread that uses it, in
+        # case release() gave up waiting while grab() was stalled on the network
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def _record_grab(self):
+        now = time.monotonic()
+        if self.last_grab_time is not None:
+            interval = now - self.last_grab_time
+            if interval > 0:
+                instant_fps = 1.0 / interval
+                if self.fps == 0.0:
+                    self.fps = instant_fps
+                else:
+                    self.fps += self.fps_smoothing * (instant_fps - self.fps)
+        self.last_grab_time = now
+        self.grab_count += 1
+
+    def _reconnect(self):
+        if self.cap is not None:
+            self.cap.release()
+        self.cap = self._open()
+        self.last_grab_time = None
+        self.reconnect_count += 1
+        if self.connected:
+            print(f"Capture source '{self.source}' reconnected.")
+
+    def read(self, timeout=1.0):
+        """
+        Returns (ret, frame) like cv2.VideoCapture.read().
+
+        For live sources the grab thread is asked to decode the next frame it
+        grabs; (False, None) means no frame arrived within timeout, not that
+        the stream has ended.
+        """
+        if not self.live or self.grab_thread is None:
+            if self.cap is None:
+                return False, None
+            ret, frame = self.cap.read()
+            if not ret and self.loop:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = self.cap.read()
+            if ret:
+                self.decoded_count += 1
+                if self.loop:
+                    self._pace()
+                # Without a grab loop every read is a grab, so fps is the rate frames are consumed
+                self._record_grab()
+            return ret, frame
+
+        with self.frame_ready:
+            seq = self.frame_seq
+            self.frame_wanted.set()
+            self.frame_ready.wait_for(lambda: self.frame_seq != seq or self.stop_event.is_set(), timeout)
+            if self.frame_seq == seq:
+                return False, None
+            frame, self.latest_frame = self.latest_frame, None
+            return True, frame
+
+    def _pace(self):
+        """Holds a looped recording to its own frame rate instead of decoding as fast as possible."""
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        now = time.monotonic()
+        if self.next_frame_time is None or now - self.next_frame_time > 1.0:
+            self.next_frame_time = now
+        delay = self.next_frame_time - now
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame_time += 1.0 / fps
+
+    def stats(self):
+        return {
+            "fps": self.fps,
+            "grabbed": self.grab_count,
+            "retrieved": self.decoded_count,
+            "dropped": max(0, self.grab_count - self.decoded_count),
+            "reconnects": self.reconnect_count,
+            "connected": self.connected,
+        }
+
+    def release(self, timeout=2.0):
+        self.stop_event.set()
+        with self.frame_ready:
+            self.frame_ready.notify_all()
+        if self.grab_thread is not None:
+            self.grab_thread.join(timeout=timeout)
+            if self.grab_thread.is_alive():
+                print(f"Capture source '{self.source}' is still blocked, it will be released when the grab returns.")
+                return
+            self.grab_thread = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
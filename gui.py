@@ -2,18 +2,20 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
 import cv2
-import os
-import requests
-import re
 import threading
 import sys
+from collections import deque
 from queue import Queue, Empty
 from ontology_reader import OntologyReader
+from ontology_registry import ONTOLOGY_OPTIONS
 from video_threads import HandTrackingThread, VideoCaptureThread
+from target_cache import TargetCache
+from robobrain_response import read_answer, normalize_center
+from task_scheduler import TaskScheduler
+from session_journal import SessionJournal
+from startup import LazyResource, startup_profile, pil_modules, rdflib_module, requests_module
 import base64
-import google.generativeai as genai
 import time
 
 # --- YOU MUST REPLACE THIS WITH YOUR GEMINI API KEY ---
@@ -25,23 +27,69 @@ BASE_URL = "<PLACE IN HERE>" # REPLACE THIS WITH YOUR RoboBrain API
 VERIFY_URL = f"{BASE_URL}verify"
 PROMPT_URL = f"{BASE_URL}prompt"
 
+# Background task limits: worker pool size and per-kind deadlines in seconds
+MAX_API_WORKERS = 2
+TASK_DEADLINES = {"detect": 30, "verify": 30, "execute_step": 45}
+
+# A journalled RoboBrain image ID is reused on resume only if it is younger than this (seconds)
+VERIFIED_IMAGE_MAX_AGE = 30 * 60
+
+# The terminal panel keeps only this many of the most recent lines
+MAX_TERMINAL_LINES = 2000
+
+# Hands tracked at once. MediaPipe only skips palm detection while this many
+# hands are being tracked, so with 2 and a single user in view the detector
+# runs on every frame. Raise it only for stations shared by two users.
+MAX_NUM_HANDS = 1
+
+class ApplianceNotVerified(Exception):
+    pass
+
 # Terminal Output Switcher
 class StdoutRedirector:
-    def __init__(self, text_widget):
+    """
+    Sends print output to the terminal widget. Worker threads print too, so
+    writes are buffered and moved into the widget on the Tk thread, and the
+    oldest lines are dropped once the widget holds more than max_lines.
+    """
+
+    def __init__(self, text_widget, max_lines=MAX_TERMINAL_LINES, flush_interval=100):
         self.text_widget = text_widget
         self.text_widget.config(state=tk.NORMAL)
+        self.max_lines = max_lines
+        self.flush_interval = flush_interval
+        self.pending = deque(maxlen=max_lines)
+        self.after_id = None
+        self._drain()
 
     def write(self, string):
-        self.text_widget.insert(tk.END, string)
-        self.text_widget.see(tk.END)
+        self.pending.append(string)
+
+    def _drain(self):
+        chunks = []
+        while self.pending:
+            chunks.append(self.pending.popleft())
+        if chunks:
+            self.text_widget.insert(tk.END, "".join(chunks))
+            line_count = int(self.text_widget.index("end-1c").split(".")[0])
+            if line_count > self.max_lines:
+                self.text_widget.delete("1.0", f"{line_count - self.max_lines + 1}.0")
+            self.text_widget.see(tk.END)
+        self.after_id = self.text_widget.after(self.flush_interval, self._drain)
+
+    def stop(self):
+        if self.after_id is not None:
+            self.text_widget.after_cancel(self.after_id)
+            self.after_id = None
 
     def flush(self):
         pass
 
 # Main GUI
 class ApplianceControlGUI(tk.Tk):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, camera_source=0, loop_video=False):
+        with startup_profile.section("create Tk window"):
+            super().__init__()
         self.title("Appliance Control (GUI, Ontology & Hand Tracking)")
         self.state('zoomed')
         
@@ -50,6 +98,9 @@ class ApplianceControlGUI(tk.Tk):
         self.current_namespace = None
         self.current_appliance_id = None
         self.verified_image_id = None
+        self.verified_frame = None
+        self.target_cache = TargetCache()
+        self.journal = SessionJournal()
         
         self.behaviour_sequence = []
         self.current_step = None
@@ -58,30 +109,28 @@ class ApplianceControlGUI(tk.Tk):
 
         self.frame_queue = Queue(maxsize=2)
         self.shutdown_event = threading.Event()
+        self.scheduler = TaskScheduler(MAX_API_WORKERS, dispatch=lambda callback, *args: self.after(0, callback, *args))
+        self.max_num_hands = MAX_NUM_HANDS
         
         # Droidcam or Camera
-        self.camera_source = 0
+        self.camera_source = camera_source
         #self.camera_source = "<PLACE IN HERE>"  
         # REPLACE WITH YOUR DROIDCAM IP "http://<IP>:<PORT>"
         # REPLACE WITH "0" FOR DEVICE CAMERA (LAPTOP/PC)
         
-        # Configure Gemini API
-        try:
-            genai.configure(api_key=GEMINI_API_KEY)
-            self.gemini_model = genai.GenerativeModel('gemini-1.5-flash-latest')
-        except Exception as e:
-            messagebox.showerror("API Key Error", f"Failed to configure Gemini API. Check your API key. Error: {e}")
-            self.destroy()
-            return
+        # Gemini API is configured in the background once the window is up
+        self.gemini_model = LazyResource("Gemini SDK", self._create_gemini_model)
 
-        self.hand_thread = HandTrackingThread(self.frame_queue, self.shutdown_event)
-        self.video_thread = VideoCaptureThread(
-            self.camera_source, 
-            self.interaction_queue, 
-            self.frame_queue,
-            self.hand_thread,
-            self.shutdown_event
-        )
+        self.hand_thread = HandTrackingThread(self.frame_queue, self.shutdown_event, max_num_hands=self.max_num_hands)
+        with startup_profile.section("open camera"):
+            self.video_thread = VideoCaptureThread(
+                self.camera_source, 
+                self.interaction_queue, 
+                self.frame_queue,
+                self.hand_thread,
+                self.shutdown_event,
+                loop_video=loop_video
+            )
 
         if not self.video_thread.cap.isOpened():
             messagebox.showerror("Error", "Unable to open webcam. Check camera connection.")
@@ -89,19 +138,17 @@ class ApplianceControlGUI(tk.Tk):
             return
             
         self.current_video_frame = None
+        self.source_stats_time = 0.0
+        self.flowchart_signature = None
         
-        self.ontology_options = {
-            "microwave": ("microwave_ontology.ttl", "http://www.example.org/microwave_ontology#", "microwave"),
-            "kettle": ("ketel_ontology.ttl", "http://www.example.org/ketel_ontology#", "kettle"),
-            "stove": ("stove_ontology.ttl", "http://www.example.org/stove_ontology#", "stove"),
-            "laptop": ("laptop_ontology.ttl", "http://www.example.org/laptop_ontology#", "laptop")
-            # UPLOAD YOUR ONTOLOGY URL 
-            # "<OBJECT NAME>":("FILE NAME .ttl", "ONTOLOGY PREFIX IN YOUR ONTOLOGY FILE", "<OBJECT NAME IN YOUR ONTOLOGY>")
-        }
+        # Register new appliances in ontology_registry.py
+        self.ontology_options = dict(ONTOLOGY_OPTIONS)
         
         self.original_stdout = sys.stdout
-        self.create_widgets()
-        sys.stdout = StdoutRedirector(self.terminal_text)
+        with startup_profile.section("build widgets"):
+            self.create_widgets()
+        self.stdout_redirector = StdoutRedirector(self.terminal_text)
+        sys.stdout = self.stdout_redirector
         
         self.hand_thread.daemon = True 
         self.video_thread.daemon = True 
@@ -112,6 +159,21 @@ class ApplianceControlGUI(tk.Tk):
         self.update_video_feed()
         self.check_interaction_queue()
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        startup_profile.mark("window ready")
+
+        # Heavy libraries load while the camera feed is already showing
+        self.gemini_model.preload(on_error=lambda e: self.after(0, self._handle_gemini_error, e))
+        rdflib_module.preload()
+        requests_module.preload()
+        self.after(500, self.offer_session_resume)
+
+    def _create_gemini_model(self):
+        import google.generativeai as genai
+        genai.configure(api_key=GEMINI_API_KEY)
+        return genai.GenerativeModel('gemini-1.5-flash-latest')
+
+    def _handle_gemini_error(self, e):
+        messagebox.showerror("API Key Error", f"Failed to configure Gemini API. Check your API key. Error: {e}")
 
     def create_widgets(self):
         style = ttk.Style()
@@ -120,6 +182,7 @@ class ApplianceControlGUI(tk.Tk):
         style.configure("TLabel", background="#e0e0e0", font=('Arial', 10))
         style.configure("TButton", font=('Arial', 10, 'bold'))
         style.configure("TLabelFrame", font=('Arial', 12, 'bold'))
+        style.configure("Current.TFrame", background="#d0e0ff")
         
         main_frame = ttk.Frame(self, padding="10")
         main_frame.pack(fill="both", expand=True)
@@ -161,11 +224,11 @@ class ApplianceControlGUI(tk.Tk):
         self.functions_frame.grid(row=0, column=0, rowspan=2, sticky="nsew", padx=5, pady=5)
         self.create_scrollable_frame(self.functions_frame, "functions")
 
-        video_frame = ttk.LabelFrame(mid_container, text="Live Camera Feed")
-        video_frame.grid(row=0, column=1, sticky="nsew", padx=5, pady=5)
-        video_frame.grid_rowconfigure(0, weight=1)
-        video_frame.grid_columnconfigure(0, weight=1)
-        self.video_label = ttk.Label(video_frame)
+        self.video_frame = ttk.LabelFrame(mid_container, text="Live Camera Feed")
+        self.video_frame.grid(row=0, column=1, sticky="nsew", padx=5, pady=5)
+        self.video_frame.grid_rowconfigure(0, weight=1)
+        self.video_frame.grid_columnconfigure(0, weight=1)
+        self.video_label = ttk.Label(self.video_frame)
         self.video_label.grid(row=0, column=0, sticky="nsew")
         
         self.behaviour_frame = ttk.LabelFrame(mid_container, text="Behaviour Controls")
@@ -199,8 +262,11 @@ class ApplianceControlGUI(tk.Tk):
     def check_interaction_queue(self):
         try:
             message = self.interaction_queue.get_nowait()
-            if message == "TOUCH_DETECTED":
-                print("🚀 Touch detected! Proceed to the next step.")
+            if message.get("type") == "TOUCH_DETECTED":
+                hand_label = f"hand {message['hand_id']}"
+                if message.get("handedness"):
+                    hand_label += f" ({message['handedness']})"
+                print(f"🚀 Touch detected by {hand_label}! Proceed to the next step.")
                 if self.current_step:
                     self.behaviour_sequence.append(self.current_step)
                 self.execute_next_step()
@@ -219,30 +285,28 @@ class ApplianceControlGUI(tk.Tk):
             print("Failed to get frame from video thread.")
             return
 
-        threading.Thread(target=self._run_detection_thread, args=(frame,)).start()
-
-    def _run_detection_thread(self, frame):
-        try:
-            # Convert frame to image format for Gemini
-            _, buffer = cv2.imencode('.jpg', frame)
-            base64_image = base64.b64encode(buffer).decode('utf-8')
-            
-            prompt = "What is the main object in this image? Respond with only a single word in lowercase."
-            
-            image_part = {
-                "mime_type": "image/jpeg",
-                "data": base64_image
-            }
+        # Repeated clicks coalesce: only the newest detection request is answered
+        self.scheduler.submit("detect", self._run_detection_task, frame,
+                              on_result=self._handle_detection_result,
+                              on_error=self._handle_detection_error,
+                              deadline=TASK_DEADLINES["detect"])
 
-            response = self.gemini_model.generate_content([prompt, image_part])
-            
-            detected_object = response.text.strip().lower()
-            
-            self.after(0, self._handle_detection_result, detected_object)
+    def _run_detection_task(self, task, frame):
+        # Convert frame to image format for Gemini
+        _, buffer = cv2.imencode('.jpg', frame)
+        base64_image = base64.b64encode(buffer).decode('utf-8')
+        
+        prompt = "What is the main object in this image? Respond with only a single word in lowercase."
+        
+        image_part = {
+            "mime_type": "image/jpeg",
+            "data": base64_image
+        }
 
-        except Exception as e:
-            self.after(0, self._handle_detection_error, e)
+        response = self.gemini_model.get().generate_content([prompt, image_part], request_options={"timeout": task.timeout(30)})
         
+        return response.text.strip().lower()
+
 
     def _handle_detection_result(self, detected_object):
         print(f"Gemini detected: '{detected_object}'")
@@ -270,11 +334,14 @@ class ApplianceControlGUI(tk.Tk):
         
         try:
             file, namespace_uri, appliance_id = self.ontology_options[selected_key]
+            # Work still in flight for the previous appliance must not report back
+            self.scheduler.cancel_all()
             self.current_namespace = self.ontology_reader.load_ontology(file, namespace_uri)
             self.selected_appliance_uri = self.current_namespace[appliance_id]
             self.current_appliance_id = appliance_id
             self.id_label.config(text=appliance_id)
             self.verified_image_id = None
+            self.verified_frame = None
             self.status_label.config(text="🟡")
             
             self.behaviour_sequence = []
@@ -287,6 +354,9 @@ class ApplianceControlGUI(tk.Tk):
             else:
                 print("No steps were detected in the ontology.")
                 
+            self.journal.start_session(selected_key, appliance_id)
+            self._journal_steps()
+
             self.update_behaviour_flowchart()
             self.update_functions_gui()
             print(f"Successfully switched to {appliance_id}.")
@@ -305,8 +375,8 @@ class ApplianceControlGUI(tk.Tk):
                 return
 
             for func in functions:
-                func_name = func['name']
-                func_mp = func['implements_mp']
+                func_name = func.name
+                func_mp = func.implements_mp
 
                 function_panel = ttk.Frame(self.functions_inner_frame, relief="groove", borderwidth=1, padding=5)
                 function_panel.pack(fill="x", padx=5, pady=5)
@@ -319,12 +389,13 @@ class ApplianceControlGUI(tk.Tk):
     def add_function_to_queue(self, func_details):
         step = {
             "step_uri": None,
-            "function_name": func_details['name'],
-            "implements_mp": func_details['implements_mp'],
-            "uri": func_details['uri']
+            "function_name": func_details.name,
+            "implements_mp": func_details.implements_mp,
+            "uri": func_details.uri
         }
         self.step_queue.put(step)
-        print(f"Function '{func_details['name']}' added to queue.")
+        self._journal_steps()
+        print(f"Function '{func_details.name}' added to queue.")
         self.update_behaviour_flowchart()
         
         if self.current_step is None:
@@ -344,36 +415,34 @@ class ApplianceControlGUI(tk.Tk):
             self.status_label.config(text="🔴")
             return
         
-        threading.Thread(target=self._run_verification_thread, args=(frame,)).start()
+        self.scheduler.submit("verify", self._run_verification_task, frame, self.current_appliance_id,
+                              on_result=self._handle_verification_result,
+                              on_error=self._handle_verification_error,
+                              deadline=TASK_DEADLINES["verify"])
 
-    def _run_verification_thread(self, frame):
-        try:
-            temp_image_path = "temp_frame.jpg"
-            cv2.imwrite(temp_image_path, frame)
-            
-            with open(temp_image_path, 'rb') as image_file:
-                files = {'image': (os.path.basename(temp_image_path), image_file, 'image/jpeg')}
-                payload = {'object_id': self.current_appliance_id}
+    def _run_verification_task(self, task, frame, appliance_id):
+        # Encoded in memory so overlapping verifications never share a temp file
+        _, buffer = cv2.imencode('.jpg', frame)
+        files = {'image': ("temp_frame.jpg", buffer.tobytes(), 'image/jpeg')}
+        payload = {'object_id': appliance_id}
 
-                print(f"Sending verification request to Robobrain API for {self.current_appliance_id}...")
-                response = requests.post(VERIFY_URL, files=files, data=payload, timeout=20)
-                response.raise_for_status()
-            
-            result = response.json()
-            verified_image_id = result.get("image_id")
-            
-            self.after(0, self._handle_verification_result, verified_image_id)
-        except requests.exceptions.RequestException as e:
-            self.after(0, self._handle_verification_error, e)
-        finally:
-            if os.path.exists(temp_image_path):
-                os.remove(temp_image_path)
+        print(f"Sending verification request to Robobrain API for {appliance_id}...")
+        requests = requests_module.get()
+        response = requests.post(VERIFY_URL, files=files, data=payload, timeout=task.timeout(20))
+        response.raise_for_status()
+        
+        result = response.json()
+        return result.get("image_id"), frame
 
-    def _handle_verification_result(self, verified_image_id):
+    def _handle_verification_result(self, result):
+        verified_image_id, frame = result
         self.verified_image_id = verified_image_id
+        # RoboBrain answers in pixels of the image it verified, so keep it to normalize against
+        self.verified_frame = frame if verified_image_id else None
         if self.verified_image_id:
             print(f"✅ Verification successful! Image ID: {self.verified_image_id}")
             self.status_label.config(text="🟢")
+            self.journal.record_verification(verified_image_id, frame)
             
             if not self.step_queue.empty():
                 print("Starting ontology steps...")
@@ -390,33 +459,29 @@ class ApplianceControlGUI(tk.Tk):
         self.status_label.config(text="🔴")
         messagebox.showerror("Network Error", f"Unable to connect to Robobrain server: {e}")
 
-    def get_coordinates_from_roborain(self, prompt):
+    def get_coordinates_from_roborain(self, prompt, on_target=None, timeout=20):
+        # Runs on a scheduler worker: errors are raised and shown by the task's on_error on the Tk thread
         if not self.verified_image_id:
-            messagebox.showwarning("Warning", "Device not verified.")
-            return None
-        
-        try:
-            payload = {'image_id': self.verified_image_id, 'prompt': prompt}
-            print(f"Sending prompt to Robobrain API: '{prompt}' with Image ID: {self.verified_image_id}...")
-            response = requests.post(PROMPT_URL, data=payload, timeout=20)
+            raise ApplianceNotVerified("Device not verified.")
+        
+        # Normalize to the verified image so the points are resolution independent
+        h, w = self.verified_frame.shape[:2]
+        on_shape = None
+        if on_target:
+            on_shape = lambda shape: on_target(normalize_center(shape, w, h))
+
+        requests = requests_module.get()
+        payload = {'image_id': self.verified_image_id, 'prompt': prompt}
+        print(f"Sending prompt to Robobrain API: '{prompt}' with Image ID: {self.verified_image_id}...")
+        with requests.post(PROMPT_URL, data=payload, timeout=timeout, stream=True) as response:
             response.raise_for_status()
-            
-            result = response.json()
-            answer_text = result.get('answer', '')
-            print(f"Response from Robobrain: {answer_text}")
+            answer = read_answer(response, on_shape)
+        print(f"Response from Robobrain: {answer.text}")
 
-            point_pattern = r'\(\s*(\d+)\s*,\s*(\d+)\s*\)'
-            extracted_points = re.findall(point_pattern, answer_text)
-            
-            if extracted_points:
-                return [(int(x), int(y)) for x, y in extracted_points]
-            else:
-                print("RoboBrain did not find the coordinates.")
-                return []
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error communicating with Robobrain API: {e}")
-            messagebox.showerror("Network Error", f"Unable to connect to Robobrain server: {e}")
-            return None
+        targets = answer.normalized_targets(w, h)
+        if not targets:
+            print("RoboBrain did not find the coordinates.")
+        return targets
 
     def execute_next_step(self):
         if not self.step_queue.empty():
@@ -424,49 +489,185 @@ class ApplianceControlGUI(tk.Tk):
                 self.behaviour_sequence.append(self.current_step)
 
             self.current_step = self.step_queue.get()
+            # Queued now, not when RoboBrain answers: a touch on a streamed
+            # first target may advance the sequence before the full answer arrives
+            if self.current_step.get('step_uri'):
+                next_step = self.ontology_reader.get_next_step(self.current_step['step_uri'], self.current_namespace)
+                if next_step:
+                    self.step_queue.put(next_step)
+            self._journal_steps()
             print(f"\n▶️ Execute steps: {self.current_step['function_name']}")
             self.update_behaviour_flowchart()
             
-            threading.Thread(target=self._run_execute_function_thread, args=(self.current_step,)).start()
+            step_details = self.current_step
+            self.scheduler.submit("execute_step", self._run_execute_function_task, step_details,
+                                  on_result=lambda result: self._handle_function_result(step_details, *result),
+                                  on_error=self._handle_function_error,
+                                  deadline=TASK_DEADLINES["execute_step"])
         else:
             if self.current_step:
                 self.behaviour_sequence.append(self.current_step)
             self.current_step = None
+            self._journal_steps()
+            self.journal.record("sequence_complete")
             print("The ontology sequence is complete.")
             self.update_behaviour_flowchart()
 
-    def _run_execute_function_thread(self, step_details):
+    def _journal_steps(self):
+        # Written before the GUI acts on the transition so a crash can resume at this exact step
+        self.journal.record("steps", sequence=self.behaviour_sequence, current_step=self.current_step,
+                            queue=list(self.step_queue.queue))
+
+    def _run_execute_function_task(self, task, step_details):
         func_name = step_details['function_name']
+        appliance_id = self.current_appliance_id
+
+        frame = self.video_thread.get_frame()
+        if frame is not None:
+            cached_points = self.target_cache.lookup(appliance_id, func_name, frame)
+            if cached_points:
+                print(f"Using cached targets for '{func_name}', no Robobrain request needed.")
+                return cached_points, frame
+
+        verified_frame = self.verified_frame
         prompt = f"show me the location of the '{func_name}'."
-        coordinates = self.get_coordinates_from_roborain(prompt)
+        seeded = []
 
-        if coordinates is not None:
-            self.after(0, self._handle_function_result, step_details, coordinates)
-            
-    def _handle_function_result(self, step_details, coordinates):
+        def seed_first_target(point):
+            # Streamed answers: start tracking the first target before the rest arrives
+            if not seeded and task.is_current():
+                seeded.append(point)
+                self.after(0, self._seed_target, step_details, point)
+
+        coordinates = self.get_coordinates_from_roborain(prompt, on_target=seed_first_target, timeout=task.timeout(20))
+
+        task.check()
+        frame = self.video_thread.get_frame()
+        if coordinates and verified_frame is not None:
+            self.target_cache.store(appliance_id, func_name, verified_frame, coordinates)
+            if frame is not None:
+                coordinates = self.target_cache.map_points(coordinates, verified_frame, frame)
+        return coordinates, frame
+
+    def _handle_function_error(self, e):
+        step = self.current_step
+        if step is not None:
+            # Back to the front of the queue: Re-Verification (or adding a function) retries it
+            self._requeue_step(step)
+            self.current_step = None
+            self._journal_steps()
+            self.update_behaviour_flowchart()
+
+        if isinstance(e, ApplianceNotVerified):
+            messagebox.showwarning("Warning", str(e))
+            return
+        print(f"❌ Error communicating with Robobrain API: {e}")
+        messagebox.showerror("Network Error", f"Unable to get the target from Robobrain: {e}\n"
+                                              "Press Re-Verification to retry the step.")
+
+    def _requeue_step(self, step):
+        """Puts step back at the front of the queue, dropping the successor that was queued when it started."""
+        queued = list(self.step_queue.queue)
+        if step.get('step_uri'):
+            # Starting the step again queues its ontology successor again
+            next_step = self.ontology_reader.get_next_step(step['step_uri'], self.current_namespace)
+            if next_step:
+                for i, queued_step in enumerate(queued):
+                    if queued_step.get('step_uri') == next_step['step_uri']:
+                        del queued[i]
+                        break
+        self.step_queue = Queue()
+        for queued_step in [step] + queued:
+            self.step_queue.put(queued_step)
+
+    def _seed_target(self, step_details, point):
+        if self.current_step is not step_details:
+            return
+        frame = self.video_thread.get_frame()
+        if frame is not None:
+            h, w = frame.shape[:2]
+            print(f"First target streamed from Robobrain: {point}")
+            self.video_thread.create_trackers([(int(point[0] * w), int(point[1] * h))], frame)
+
+    def _handle_function_result(self, step_details, coordinates, frame):
+        if step_details is not self.current_step:
+            # The step was already completed by a touch on its streamed first target
+            return
         if coordinates:
-            print(f"Successfully obtained coordinates from Robobrain: {coordinates}")
+            print(f"Successfully obtained coordinates: {coordinates}")
             
-            frame = self.video_thread.get_frame()
             if frame is not None:
                 self.video_thread.create_trackers(coordinates, frame)
         else:
             print("Robobrain did not find coordinates for this command.")
             messagebox.showinfo("Target Not Found", f"Robobrain did not find a target for '{step_details['function_name']}'.")
         
-        if step_details.get('step_uri'):
-            next_step = self.ontology_reader.get_next_step(step_details['step_uri'], self.current_namespace)
-            if next_step:
-                self.step_queue.put(next_step)
-        
         if not coordinates:
             self.execute_next_step()
             
+    def offer_session_resume(self):
+        state = self.journal.replay()
+        if state is None or not state.resumable or state.appliance_key not in self.ontology_options:
+            return
+
+        step = state.current_step or state.queued_steps[0]
+        if messagebox.askyesno("Resume Session", f"A previous session for '{state.appliance_id}' stopped at step "
+                                                 f"'{step['function_name']}'. Resume from there?"):
+            self.resume_session(state)
+        else:
+            self.journal.clear()
+
+    def resume_session(self, state):
+        print(f"Resuming previous session for {state.appliance_id}...")
+        self.load_appliance_ontology(state.appliance_key)
+        if self.current_appliance_id != state.appliance_id:
+            return
+
+        URIRef = rdflib_module.get().URIRef
+
+        def restore(step):
+            step = dict(step)
+            for key in ("step_uri", "uri"):
+                if step.get(key):
+                    step[key] = URIRef(step[key])
+            return step
+
+        self.behaviour_sequence = [restore(step) for step in state.behaviour_sequence]
+        self.step_queue = Queue()
+        for step in state.queued_steps:
+            self.step_queue.put(restore(step))
+        if state.current_step:
+            self._requeue_step(restore(state.current_step))
+        self.current_step = None
+        # Targets already received were stored in the TargetCache, which maps them onto the live view
+        self._journal_steps()
+        self.update_behaviour_flowchart()
+
+        if state.verified_image_valid(VERIFIED_IMAGE_MAX_AGE):
+            frame = state.load_verified_frame()
+            if frame is not None:
+                print(f"✅ Reusing verified Image ID: {state.verified_image_id}")
+                self.verified_image_id = state.verified_image_id
+                self.verified_frame = frame
+                self.status_label.config(text="🟢")
+                self.journal.record_verification(state.verified_image_id, verified_at=state.verified_at)
+                self.execute_next_step()
+                return
+
+        self.verify_appliance()
+
     def update_behaviour_flowchart(self):
+        all_steps = self.behaviour_sequence + ([self.current_step] if self.current_step else [])
+
+        # Rebuilding the widgets is only needed when what they show has changed
+        signature = (tuple((step['function_name'], step['implements_mp']) for step in all_steps),
+                     self.current_step.get("function_name") if self.current_step else None)
+        if signature == self.flowchart_signature:
+            return
+        self.flowchart_signature = signature
+
         for widget in self.behaviour_inner_frame.winfo_children():
             widget.destroy()
-
-        all_steps = self.behaviour_sequence + ([self.current_step] if self.current_step else [])
         
         if not all_steps:
             ttk.Label(self.behaviour_inner_frame, text="The order will appear here.", foreground="#888").pack(pady=10)
@@ -478,12 +679,7 @@ class ApplianceControlGUI(tk.Tk):
             step_frame = ttk.Frame(self.behaviour_inner_frame, relief="solid", borderwidth=1, padding=10)
             step_frame.pack(fill="x", padx=10, pady=5)
             
-            if is_current:
-                style = ttk.Style()
-                style.configure("Current.TFrame", background="#d0e0ff")
-                step_frame.config(style="Current.TFrame")
-            else:
-                step_frame.config(style="TFrame")
+            step_frame.config(style="Current.TFrame" if is_current else "TFrame")
                 
             ttk.Label(step_frame, text=f"{i+1}. {step['function_name']}", font=('Arial', 10, 'bold')).pack(anchor="w")
             ttk.Label(step_frame, text=f"MP: {step['implements_mp']}", font=('Arial', 9)).pack(anchor="w")
@@ -496,7 +692,7 @@ class ApplianceControlGUI(tk.Tk):
                 arrow_label.pack(pady=2)
 
     def update_video_feed(self):
-        frame = self.video_thread.get_frame()
+        frame = self.video_thread.get_frame(copy=False)
 
         if frame is not None:
             h, w, _ = frame.shape
@@ -504,19 +700,44 @@ class ApplianceControlGUI(tk.Tk):
             ratio = min(max_w / w, max_h / h)
             new_w, new_h = int(w * ratio), int(h * ratio)
             
-            img_resized = cv2.resize(frame, (new_w, new_h))
+            img_resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+            self.video_thread.overlay.draw(img_resized)
             img_rgb = cv2.cvtColor(img_resized, cv2.COLOR_BGR2RGB)
+            Image, ImageTk = pil_modules.get()
             img_pil = Image.fromarray(img_rgb)
             
-            self.current_video_frame = ImageTk.PhotoImage(image=img_pil)
-            self.video_label.config(image=self.current_video_frame)
-            self.video_label.image = self.current_video_frame
+            photo = self.current_video_frame
+            if photo is not None and (photo.width(), photo.height()) == img_pil.size:
+                # Draw into the existing Tk image instead of allocating a new one every frame
+                photo.paste(img_pil)
+            else:
+                self.current_video_frame = ImageTk.PhotoImage(image=img_pil)
+                self.video_label.config(image=self.current_video_frame)
+                self.video_label.image = self.current_video_frame
+
+            if not startup_profile.reported:
+                startup_profile.mark("first camera frame shown")
+                startup_profile.report()
+
+        now = time.monotonic()
+        if now - self.source_stats_time >= 1.0:
+            self.source_stats_time = now
+            self.update_source_stats()
 
         self.after(30, self.update_video_feed)
+
+    def update_source_stats(self):
+        stats = self.video_thread.get_source_stats()
+        if not stats["connected"]:
+            text = "Live Camera Feed (reconnecting...)"
+        else:
+            text = f"Live Camera Feed ({stats['fps']:.1f} fps, {stats['dropped']} stale frames skipped)"
+        self.video_frame.config(text=text)
     
     def on_closing(self):
         print("Closing application. Signaling threads to stop...")
         self.shutdown_event.set()
+        self.scheduler.shutdown()
         
         if self.hand_thread and self.hand_thread.is_alive():
             print("Waiting for hand tracking thread to join...")
@@ -526,5 +747,6 @@ class ApplianceControlGUI(tk.Tk):
             self.video_thread.join(timeout=2)
         
         print("All threads have been stopped. Destroying GUI.")
+        self.stdout_redirector.stop()
         sys.stdout = self.original_stdout
         self.destroy()
\ No newline at end of file
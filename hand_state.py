@@ -0,0 +1,83 @@
+# hand_state.py
+
+import math
+from collections import deque
+
+class TrackedHand:
+    """Per-hand state that survives across frames: a stable ID and fingertip smoothing history."""
+
+    def __init__(self, hand_id, center, history_size):
+        self.hand_id = hand_id
+        self.center = center
+        self.handedness = None
+        self.missed_frames = 0
+        self.thumb_tip_history = deque(maxlen=history_size)
+        self.index_tip_history = deque(maxlen=history_size)
+        self.smoothed_thumb = None
+        self.smoothed_index = None
+
+    def update_fingertips(self, thumb_point, index_point):
+        """Adds the raw fingertip points to this hand's history and returns the smoothed averages."""
+        self.smoothed_thumb = self._smooth(self.thumb_tip_history, thumb_point)
+        self.smoothed_index = self._smooth(self.index_tip_history, index_point)
+        return self.smoothed_thumb, self.smoothed_index
+
+    @staticmethod
+    def _smooth(history, new_point):
+        history.append(new_point)
+        avg_x = sum(p[0] for p in history) / len(history)
+        avg_y = sum(p[1] for p in history) / len(history)
+        return (int(avg_x), int(avg_y))
+
+class HandAssociator:
+    """
+    Gives each detected hand a stable ID by nearest-neighbour matching of hand
+    centers between frames. Centers are normalized (0-1) image coordinates so
+    the match distance does not depend on the camera resolution.
+    """
+
+    def __init__(self, history_size=5, max_match_distance=0.2, max_missed_frames=10):
+        self.history_size = history_size
+        self.max_match_distance = max_match_distance
+        self.max_missed_frames = max_missed_frames
+        self.hands = {}
+        self.next_id = 1
+
+    def update(self, centers):
+        """Returns one TrackedHand per center, in the same order as centers."""
+        pairs = []
+        for hand_id, hand in self.hands.items():
+            for i, center in enumerate(centers):
+                distance = math.dist(hand.center, center)
+                if distance <= self.max_match_distance:
+                    pairs.append((distance, hand_id, i))
+        pairs.sort()
+
+        assigned = [None] * len(centers)
+        matched_ids = set()
+        for distance, hand_id, i in pairs:
+            if hand_id in matched_ids or assigned[i] is not None:
+                continue
+            hand = self.hands[hand_id]
+            hand.center = centers[i]
+            hand.missed_frames = 0
+            assigned[i] = hand
+            matched_ids.add(hand_id)
+
+        for hand_id in list(self.hands):
+            if hand_id not in matched_ids:
+                hand = self.hands[hand_id]
+                hand.missed_frames += 1
+                if hand.missed_frames > self.max_missed_frames:
+                    del self.hands[hand_id]
+
+        for i, center in enumerate(centers):
+            if assigned[i] is None:
+                hand = TrackedHand(self.next_id, center, self.history_size)
+                self.hands[hand.hand_id] = hand
+                self.next_id += 1
+                assigned[i] = hand
+        return assigned
+
+    def reset(self):
+        self.hands = {}
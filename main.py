@@ -1,6 +1,9 @@
 # main.py
 
-from gui import ApplianceControlGUI
+from startup import startup_profile
+
+with startup_profile.section("import gui"):
+    from gui import ApplianceControlGUI
 
 if __name__ == "__main__":
     app = ApplianceControlGUI()
@@ -0,0 +1,151 @@
+# ontology_query.py
+
+from startup import rdflib_module
+
+class FunctionRecord:
+    __slots__ = ("uri", "name", "implements_mp")
+
+    def __init__(self, uri, name, implements_mp):
+        self.uri = uri
+        self.name = name
+        self.implements_mp = implements_mp
+
+    def __repr__(self):
+        return f"FunctionRecord(name={self.name!r}, implements_mp={self.implements_mp!r})"
+
+class StepRecord:
+    __slots__ = ("step_uri", "function_uri", "function_name", "implements_mp")
+
+    def __init__(self, step_uri, function_uri, function_name, implements_mp):
+        self.step_uri = step_uri
+        self.function_uri = function_uri
+        self.function_name = function_name
+        self.implements_mp = implements_mp
+
+    def as_step(self):
+        """The step dict used by the GUI's step queue."""
+        return {
+            "step_uri": self.step_uri,
+            "function_name": self.function_name,
+            "implements_mp": self.implements_mp,
+        }
+
+    def __repr__(self):
+        return f"StepRecord(function_name={self.function_name!r}, step_uri={str(self.step_uri)!r})"
+
+def _function_name(function_uri, labels):
+    label = labels.get(function_uri)
+    return str(label) if label else str(function_uri).split('#')[-1]
+
+def _implements_mp(function_uri, implements_mp):
+    value = implements_mp.get(function_uri)
+    return str(value) if value else "None"
+
+class OntologyQuery:
+    """
+    Compiled view of an appliance ontology.
+
+    Each property the reader needs is read once through rdflib's predicate
+    index (one subject_objects scan per predicate) into plain dicts, so
+    listing every function or walking the whole step chain costs a few
+    dict lookups per item instead of a Graph.value call per field.
+    Predicates are compiled lazily, on first use, so a query that only lists
+    functions never pays for the step predicates and vice versa.
+    Build a new instance whenever the graph changes.
+    """
+
+    def __init__(self, graph, namespace):
+        self.graph = graph
+        self.namespace = namespace
+        self.compiled = {}
+        self.step_cache = {}
+
+    def _index(self, name, predicate, all_values=False):
+        index = self.compiled.get(name)
+        if index is None:
+            if all_values:
+                index = self._all_values(self.graph, predicate)
+            else:
+                index = self._first_values(self.graph, predicate)
+            self.compiled[name] = index
+        return index
+
+    @property
+    def labels(self):
+        return self._index("labels", rdflib_module.get().RDFS.label)
+
+    @property
+    def implements_mp(self):
+        return self._index("implements_mp", self.namespace.implements_mp)
+
+    @property
+    def function_of_step(self):
+        return self._index("function_of_step", self.namespace.isFunctionOf)
+
+    @property
+    def next_steps(self):
+        return self._index("next_steps", self.namespace.nextStep)
+
+    @property
+    def first_steps(self):
+        return self._index("first_steps", self.namespace.hasStep, all_values=True)
+
+    @property
+    def appliance_functions(self):
+        return self._index("appliance_functions", self.namespace.hasFunction, all_values=True)
+
+    @staticmethod
+    def _first_values(graph, predicate):
+        values = {}
+        for subject, value in graph.subject_objects(predicate):
+            values.setdefault(subject, value)
+        return values
+
+    @staticmethod
+    def _all_values(graph, predicate):
+        values = {}
+        for subject, value in graph.subject_objects(predicate):
+            values.setdefault(subject, []).append(value)
+        return values
+
+    def functions(self, appliance_uri):
+        labels, implements_mp = self.labels, self.implements_mp
+        return [
+            FunctionRecord(function_uri, _function_name(function_uri, labels), _implements_mp(function_uri, implements_mp))
+            for function_uri in self.appliance_functions.get(appliance_uri, [])
+        ]
+
+
+    def step(self, step_uri):
+        """The StepRecord for step_uri, or None if it has no isFunctionOf."""
+        if step_uri in self.step_cache:
+            return self.step_cache[step_uri]
+        function_uri = self.function_of_step.get(step_uri)
+        record = None
+        if function_uri:
+            record = StepRecord(step_uri, function_uri, _function_name(function_uri, self.labels),
+                                _implements_mp(function_uri, self.implements_mp))
+        self.step_cache[step_uri] = record
+        return record
+
+    def first_step(self, appliance_uri):
+        for step_uri in self.first_steps.get(appliance_uri, []):
+            record = self.step(step_uri)
+            if record:
+                return record
+        return None
+
+    def next_step(self, step_uri):
+        next_step_uri = self.next_steps.get(step_uri)
+        return self.step(next_step_uri) if next_step_uri else None
+
+    def steps(self, appliance_uri):
+        """The full ordered step list, stopping at the end of the chain or at a repeated step."""
+        sequence = []
+        seen = set()
+        record = self.first_step(appliance_uri)
+        while record and record.step_uri not in seen:
+            seen.add(record.step_uri)
+            sequence.append(record)
+            record = self.next_step(record.step_uri)
+        return sequence
@@ -0,0 +1,15 @@
+# ontology_registry.py
+
+# Appliances the GUI can load, keyed by the object name Gemini returns
+ONTOLOGY_OPTIONS = {
+    "microwave": ("microwave_ontology.ttl", "http://www.example.org/microwave_ontology#", "microwave"),
+    "kettle": ("ketel_ontology.ttl", "http://www.example.org/ketel_ontology#", "kettle"),
+    "stove": ("stove_ontology.ttl", "http://www.example.org/stove_ontology#", "stove"),
+    "laptop": ("laptop_ontology.ttl", "http://www.example.org/laptop_ontology#", "laptop")
+    # UPLOAD YOUR ONTOLOGY URL 
+    # "<OBJECT NAME>":("FILE NAME .ttl", "ONTOLOGY PREFIX IN YOUR ONTOLOGY FILE", "<OBJECT NAME IN YOUR ONTOLOGY>")
+}
+
+def registry_by_file(options=ONTOLOGY_OPTIONS):
+    """Maps each ontology file name to (object name, namespace URI, appliance individual)."""
+    return {file: (key, namespace_uri, appliance_id) for key, (file, namespace_uri, appliance_id) in options.items()}
@@ -0,0 +1,265 @@
+# ontology_validator.py
+#
+# Batch validator for appliance ontologies, meant as a pre-deploy check.
+# Usage: python ontology_validator.py [directory] [--workers N] [--strict] [--quiet] [--check-registry]
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from ontology_reader import OntologyReader
+from ontology_registry import ONTOLOGY_OPTIONS, registry_by_file
+from startup import rdflib_module
+
+# The directory the GUI loads ontologies from, and so the one ontology_registry.py describes
+ONTOLOGY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ontologies')
+
+class ValidationReport:
+    def __init__(self, path):
+        self.path = path
+        self.errors = []
+        self.warnings = []
+
+    def error(self, message):
+        self.errors.append(message)
+
+    def warning(self, message):
+        self.warnings.append(message)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+def _local_name(uri):
+    return str(uri).split('#')[-1]
+
+def _default_namespace(graph):
+    """The URI bound to the empty prefix, e.g. '@prefix : <...#> .'"""
+    for prefix, uri in graph.namespaces():
+        if prefix == '':
+            return str(uri)
+    return None
+
+# One reader per worker process, reused for every file it validates
+_reader = None
+
+def validate_file(path, registry_entry=None, expect_registered=False):
+    """
+    Validates one ontology file. registry_entry is the (object name,
+    namespace URI, appliance individual) the GUI registers for this file,
+    or None for files the GUI does not know about; with expect_registered
+    such files get a warning.
+    """
+    global _reader
+    if _reader is None:
+        _reader = OntologyReader()
+    rdflib = rdflib_module.get()
+    RDF, RDFS, OWL = rdflib.RDF, rdflib.RDFS, rdflib.OWL
+    report = ValidationReport(path)
+
+    if registry_entry is not None:
+        _, namespace_uri, appliance_id = registry_entry
+    else:
+        namespace_uri, appliance_id = None, None
+
+    try:
+        namespace = _reader.load_ontology_file(path, namespace_uri or "urn:unresolved#")
+    except Exception as e:
+        report.error(f"failed to parse: {e}")
+        return report
+
+    graph = _reader.ontology_graph
+    declared_namespace = _default_namespace(graph)
+    if namespace_uri is None:
+        if expect_registered:
+            report.warning("file is not registered in ontology_registry.py")
+        if declared_namespace is None:
+            report.error("no default '@prefix :' namespace and no registry entry")
+            return report
+        namespace_uri = declared_namespace
+        namespace = rdflib.Namespace(namespace_uri)
+    elif declared_namespace and declared_namespace != namespace_uri:
+        report.error(f"registry namespace {namespace_uri} does not match the file's default prefix {declared_namespace}")
+
+    query = _reader.query(namespace)
+
+    # --- Appliance individual ---
+    if appliance_id is not None:
+        appliances = [namespace[appliance_id]]
+        if (appliances[0], None, None) not in graph:
+            report.error(f"registered appliance individual :{appliance_id} is not defined")
+            return report
+    else:
+        appliances = sorted(set(query.first_steps) | set(query.appliance_functions))
+        if not appliances:
+            report.error("no individual has :hasStep or :hasFunction")
+            return report
+
+    classes = set(graph.subjects(RDF.type, OWL.Class)) | set(graph.subjects(RDF.type, RDFS.Class))
+    for prop in ("hasFunction", "hasStep"):
+        for domain in graph.objects(namespace[prop], RDFS.domain):
+            if domain not in classes:
+                report.error(f":{prop} has domain :{_local_name(domain)}, which is not a declared class")
+            elif domain != namespace.Appliance:
+                report.warning(f":{prop} has domain :{_local_name(domain)} instead of :Appliance")
+
+    reachable_steps = set()
+    checked_functions = set()
+    for appliance in appliances:
+        name = f":{_local_name(appliance)}"
+        appliance_classes = list(graph.objects(appliance, RDF.type))
+        if not appliance_classes:
+            report.error(f"{name} has no rdf:type")
+        for cls in appliance_classes:
+            if cls not in classes:
+                report.error(f"{name} is typed :{_local_name(cls)}, which is not a declared class")
+                continue
+            parents = list(graph.transitive_objects(cls, RDFS.subClassOf))
+            for parent in parents:
+                if parent != cls and parent not in classes:
+                    report.error(f":{_local_name(cls)} is a subclass of :{_local_name(parent)}, which is not a declared class")
+            if namespace.Appliance not in parents:
+                report.error(f":{_local_name(cls)} is not a subclass of :Appliance")
+
+        functions = query.appliance_functions.get(appliance, [])
+        if not functions:
+            report.error(f"{name} has no :hasFunction")
+        for function_uri in functions:
+            _check_function(report, graph, query, function_uri, f"function :{_local_name(function_uri)}")
+        checked_functions.update(functions)
+
+        first_steps = query.first_steps.get(appliance, [])
+        if not first_steps:
+            report.error(f"{name} has no :hasStep, the GUI will report 'No steps were detected'")
+        elif len(first_steps) > 1:
+            report.warning(f"{name} has {len(first_steps)} :hasStep values, only one is used")
+        for first_step in first_steps:
+            reachable_steps.update(_check_step_chain(report, graph, query, namespace, first_step, set(functions)))
+    checked_functions.update(query.function_of_step.get(step) for step in reachable_steps)
+
+    # Steps and functions no appliance reaches are still loaded by the GUI, so check them too
+    for step in sorted(set(graph.subjects(RDF.type, namespace.Step)) - reachable_steps):
+        step_name = f"step :{_local_name(step)}"
+        report.warning(f"{step_name} is not reachable from any appliance's :hasStep/:nextStep chain")
+        function_uri = query.function_of_step.get(step)
+        if function_uri is None:
+            report.error(f"{step_name} has no :isFunctionOf")
+        elif function_uri not in checked_functions:
+            _check_function(report, graph, query, function_uri, f"{step_name} function :{_local_name(function_uri)}")
+            checked_functions.add(function_uri)
+    for function_uri in sorted(set(graph.subjects(RDF.type, namespace.Function)) - checked_functions):
+        _check_function(report, graph, query, function_uri, f"function :{_local_name(function_uri)}")
+
+    return report
+
+def _check_function(report, graph, query, function_uri, label):
+    if (function_uri, None, None) not in graph:
+        report.error(f"{label} is not defined")
+        return
+    if function_uri not in query.labels:
+        report.error(f"{label} has no rdfs:label")
+    if function_uri not in query.implements_mp:
+        report.error(f"{label} has no :implements_mp")
+
+def _check_step_chain(report, graph, query, namespace, first_step, appliance_functions):
+    """
+    Walks the :nextStep chain, checking it terminates, is acyclic and every
+    step names a function. Returns the steps it visited.
+    """
+    seen = []
+    step = first_step
+    while step is not None:
+        if step in seen:
+            cycle = " -> ".join(_local_name(s) for s in seen[seen.index(step):] + [step])
+            report.error(f"step chain has a cycle: {cycle}")
+            return seen
+        seen.append(step)
+        step_name = f"step :{_local_name(step)}"
+
+        if (step, None, None) not in graph:
+            report.error(f"{step_name} is referenced but not defined")
+        function_uri = query.function_of_step.get(step)
+        if function_uri is None:
+            report.error(f"{step_name} has no :isFunctionOf, the sequence stops here")
+        else:
+            _check_function(report, graph, query, function_uri, f"{step_name} function :{_local_name(function_uri)}")
+            if function_uri not in appliance_functions:
+                report.warning(f"{step_name} uses :{_local_name(function_uri)}, which the appliance does not list in :hasFunction")
+
+        next_steps = list(graph.objects(step, namespace.nextStep))
+        if len(next_steps) > 1:
+            report.error(f"{step_name} has {len(next_steps)} :nextStep values, the sequence is ambiguous")
+        step = next_steps[0] if next_steps else None
+    return seen
+
+def _validate_job(job):
+    path, registry_entry, expect_registered = job
+    return validate_file(path, registry_entry, expect_registered)
+
+def _is_registry_directory(directory):
+    try:
+        return os.path.samefile(directory, ONTOLOGY_DIR)
+    except OSError:
+        return False
+
+def validate_directory(directory, registry=ONTOLOGY_OPTIONS, workers=None, chunksize=16, check_registry=None):
+    """
+    Validates every .ttl file in directory, in parallel across processes.
+    Yields reports as they finish, in file order.
+
+    check_registry also reports registered files that are missing and files
+    that are not registered. By default it is only on for the GUI's own
+    ontologies directory, which is the one the registry describes.
+    """
+    if check_registry is None:
+        check_registry = _is_registry_directory(directory)
+    by_file = registry_by_file(registry)
+    paths = sorted(entry.path for entry in os.scandir(directory) if entry.is_file() and entry.name.endswith('.ttl'))
+    jobs = [(path, by_file.get(os.path.basename(path)), check_registry) for path in paths]
+
+    if check_registry:
+        missing = set(by_file) - {os.path.basename(path) for path in paths}
+        for file in sorted(missing):
+            report = ValidationReport(os.path.join(directory, file))
+            report.error("registered in ontology_registry.py but the file does not exist")
+            yield report
+
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _validate_job(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_validate_job, jobs, chunksize=chunksize)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate appliance ontologies before deployment.")
+    parser.add_argument("directory", nargs="?", default=ONTOLOGY_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count, 1 disables multiprocessing)")
+    parser.add_argument("--strict", action="store_true", help="treat warnings as errors")
+    parser.add_argument("--quiet", action="store_true", help="only print files with problems")
+    parser.add_argument("--check-registry", action="store_true", default=None,
+                        help="check the directory against ontology_registry.py (default: only for the GUI's ontologies directory)")
+    args = parser.parse_args(argv)
+
+    files = errors = warnings = 0
+    for report in validate_directory(args.directory, workers=args.workers, check_registry=args.check_registry):
+        files += 1
+        errors += len(report.errors)
+        warnings += len(report.warnings)
+        if args.quiet and not report.errors and not report.warnings:
+            continue
+        status = "FAIL" if report.errors else ("WARN" if report.warnings else "OK")
+        print(f"[{status}] {os.path.basename(report.path)}")
+        for message in report.errors:
+            print(f"    error: {message}")
+        for message in report.warnings:
+            print(f"    warning: {message}")
+
+    print(f"{files} file(s) checked: {errors} error(s), {warnings} warning(s).")
+    failed = errors or (args.strict and warnings)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
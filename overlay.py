@@ -0,0 +1,64 @@
+# overlay.py
+
+import threading
+import cv2
+from startup import mediapipe_solutions
+
+class OverlayLayer:
+    """
+    Holds the annotations for the latest frame (tracker dots, hand landmarks)
+    separately from the frame itself, so the captured image stays clean and the
+    annotations are drawn only once, on the downscaled display image.
+    """
+
+    def __init__(self, dot_radius=10, dot_color=(0, 0, 255), label_color=(255, 255, 255)):
+        self.dot_radius = dot_radius
+        self.dot_color = dot_color
+        self.label_color = label_color
+        self.lock = threading.Lock()
+        self.frame_size = None
+        self.tracker_centers = []
+        self.hands = []
+
+    def update(self, frame_size, tracker_centers, hands):
+        """
+        frame_size is (width, height) of the frame the pixel coordinates refer to.
+        hands is a list of (hand_id, landmarks) with MediaPipe's normalized landmarks.
+        """
+        with self.lock:
+            self.frame_size = frame_size
+            self.tracker_centers = list(tracker_centers)
+            self.hands = list(hands)
+
+    def clear(self):
+        with self.lock:
+            self.tracker_centers = []
+            self.hands = []
+
+    def draw(self, image):
+        """Draws the current annotations onto image, which may be any size."""
+        with self.lock:
+            frame_size = self.frame_size
+            tracker_centers = self.tracker_centers
+            hands = self.hands
+
+        if frame_size is None:
+            return image
+
+        h, w = image.shape[:2]
+        scale_x = w / frame_size[0]
+        scale_y = h / frame_size[1]
+        radius = max(2, int(round(self.dot_radius * min(scale_x, scale_y))))
+
+        for center_x, center_y in tracker_centers:
+            cv2.circle(image, (int(center_x * scale_x), int(center_y * scale_y)), radius, self.dot_color, -1)
+
+        # Hands are only reported once MediaPipe has loaded, so this never triggers the import
+        solutions = mediapipe_solutions.get() if hands else None
+        for hand_id, handLms in hands:
+            # Landmarks are normalized, so they draw correctly at display resolution
+            solutions.drawing_utils.draw_landmarks(image, handLms, solutions.hands.HAND_CONNECTIONS)
+            wrist = handLms.landmark[0]
+            cv2.putText(image, str(hand_id), (int(wrist.x * w), int(wrist.y * h) + 15),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.label_color, 1, cv2.LINE_AA)
+        return image
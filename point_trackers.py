@@ -0,0 +1,147 @@
+# point_trackers.py
+
+from abc import ABC, abstractmethod
+import cv2
+
+class PointTracker(ABC):
+    """
+    Interface shared by the tracker backends used for RoboBrain targets.
+
+    init(frame, bbox) starts tracking the (x, y, w, h) box, update(frame)
+    returns (success, bbox) for the next frame.
+    """
+
+    @abstractmethod
+    def init(self, frame, bbox):
+        pass
+
+    @abstractmethod
+    def update(self, frame):
+        pass
+
+class KCFPointTracker(PointTracker):
+    """OpenCV's KCF tracker (requires opencv-contrib-python)."""
+
+    def __init__(self):
+        self.tracker = cv2.TrackerKCF_create()
+
+    def init(self, frame, bbox):
+        self.tracker.init(frame, bbox)
+
+    def update(self, frame):
+        return self.tracker.update(frame)
+
+class TemplatePointTracker(PointTracker):
+    """
+    Normalized cross-correlation of a small grayscale template inside a local
+    search window around the last position. Much cheaper than KCF and well
+    suited to static targets such as appliance buttons.
+    """
+
+    def __init__(self, search_margin=1.0, match_threshold=0.6):
+        self.search_margin = search_margin
+        self.match_threshold = match_threshold
+        self.template = None
+        self.bbox = None
+
+    def init(self, frame, bbox):
+        x, y, w, h = [int(v) for v in bbox]
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        template = gray[y:y + h, x:x + w]
+        if template.size == 0 or template.shape[0] != h or template.shape[1] != w:
+            raise ValueError(f"Tracker box {bbox} is outside the frame.")
+        self.template = template.copy()
+        self.bbox = (x, y, w, h)
+
+    def update(self, frame):
+        return self.search(frame, self.bbox, self.search_margin)
+
+    def search(self, frame, around_bbox, margin):
+        """Looks for the template within margin box-sizes of around_bbox; moves there on a match."""
+        x, y, w, h = around_bbox
+        frame_h, frame_w = frame.shape[:2]
+        pad_x, pad_y = int(w * margin), int(h * margin)
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1, y1 = min(frame_w, x + w + pad_x), min(frame_h, y + h + pad_y)
+        if x1 - x0 < w or y1 - y0 < h:
+            return False, self.bbox
+
+        window = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+        scores = cv2.matchTemplate(window, self.template, cv2.TM_CCOEFF_NORMED)
+        _, max_score, _, max_loc = cv2.minMaxLoc(scores)
+        if max_score < self.match_threshold:
+            return False, self.bbox
+
+        self.bbox = (x0 + max_loc[0], y0 + max_loc[1], w, h)
+        return True, self.bbox
+
+class ReacquiringTracker(PointTracker):
+    """
+    Wraps a backend and, when it loses its target, searches for the target's
+    original template in a window around the last known position that grows
+    each frame. On a match the backend is restarted there, so a briefly
+    occluded button does not need a new RoboBrain request.
+    """
+
+    def __init__(self, backend, max_lost_frames=60, reacquire_threshold=0.7, growth_per_frame=0.25, max_margin=4.0):
+        self.backend = backend
+        self.max_lost_frames = max_lost_frames
+        self.growth_per_frame = growth_per_frame
+        self.max_margin = max_margin
+        self.finder = TemplatePointTracker(match_threshold=reacquire_threshold)
+        self.bbox = None
+        self.lost_frames = 0
+
+    def init(self, frame, bbox):
+        self.finder.init(frame, bbox)
+        self.backend.init(frame, bbox)
+        self.bbox = tuple(int(v) for v in bbox)
+        self.lost_frames = 0
+
+    def update(self, frame):
+        if self.lost_frames == 0:
+            success, bbox = self.backend.update(frame)
+            if success:
+                self.bbox = tuple(int(v) for v in bbox)
+                return True, self.bbox
+            self.lost_frames = 1
+        else:
+            self.lost_frames += 1
+
+        margin = min(self.max_margin, 1.0 + self.growth_per_frame * self.lost_frames)
+        found, bbox = self.finder.search(frame, self.bbox, margin)
+        if found:
+            try:
+                self.backend.init(frame, bbox)
+            except Exception as e:
+                print(f"Failed to re-initialize tracker: {e}")
+                return False, self.bbox
+            print(f"Tracker target re-acquired after {self.lost_frames} frame(s).")
+            self.bbox = bbox
+            self.lost_frames = 0
+            return True, self.bbox
+        return False, self.bbox
+
+    def is_lost(self):
+        return self.lost_frames > 0
+
+    def is_expired(self):
+        return self.lost_frames > self.max_lost_frames
+
+TRACKER_BACKENDS = {
+    "template": TemplatePointTracker,
+    "kcf": KCFPointTracker,
+}
+
+def create_point_tracker(backend_name, **kwargs):
+    """Builds a re-acquiring tracker around the named backend, falling back to template matching."""
+    backend_class = TRACKER_BACKENDS.get(backend_name)
+    if backend_class is None:
+        raise ValueError(f"Unknown tracker backend: {backend_name}")
+    try:
+        backend = backend_class()
+    except AttributeError:
+        # Plain opencv-python builds do not ship the contrib trackers
+        print(f"Tracker backend '{backend_name}' is unavailable, using template matching instead.")
+        backend = TemplatePointTracker()
+    return ReacquiringTracker(backend, **kwargs)
@@ -0,0 +1,284 @@
+# robobrain_response.py
+
+import json
+import re
+from dataclasses import dataclass, field
+
+NUMBER_PATTERN = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?')
+CONFIDENCE_PATTERN = re.compile(r'^\s*[,;]?\s*\(?\s*(?:conf(?:idence)?|score|p)\s*[:=]?\s*(-?\d+(?:\.\d+)?)', re.IGNORECASE)
+POLYGON_PATTERN = re.compile(r'polygon\W*$', re.IGNORECASE)
+STREAMING_CONTENT_TYPES = ('application/x-ndjson', 'application/jsonl', 'text/event-stream')
+
+def _is_normalized(values):
+    """Values given as fractions of the image (0-1 floats) rather than pixels."""
+    return all(0.0 <= v <= 1.0 for v in values) and any(not float(v).is_integer() for v in values)
+
+@dataclass
+class Point:
+    x: float
+    y: float
+    confidence: float = None
+    normalized: bool = False
+
+    @property
+    def center(self):
+        return (self.x, self.y)
+
+@dataclass
+class Box:
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    confidence: float = None
+    normalized: bool = False
+
+    @property
+    def center(self):
+        return ((self.x1 + self.x2) / 2, (self.y1 + self.y2) / 2)
+
+@dataclass
+class Polygon:
+    points: list
+    confidence: float = None
+    normalized: bool = False
+
+    @property
+    def center(self):
+        return (sum(p[0] for p in self.points) / len(self.points),
+                sum(p[1] for p in self.points) / len(self.points))
+
+@dataclass
+class RoboBrainAnswer:
+    text: str = ""
+    shapes: list = field(default_factory=list)
+
+    @property
+    def points(self):
+        return [s for s in self.shapes if isinstance(s, Point)]
+
+    @property
+    def boxes(self):
+        return [s for s in self.shapes if isinstance(s, Box)]
+
+    @property
+    def polygons(self):
+        return [s for s in self.shapes if isinstance(s, Polygon)]
+
+    def normalized_targets(self, width, height):
+        """Target centers of every shape as (x, y) fractions of a width x height image, clamped to 0-1."""
+        return [normalize_center(shape, width, height) for shape in self.shapes]
+
+def normalize_center(shape, width, height):
+    x, y = shape.center
+    if not shape.normalized:
+        x, y = x / width, y / height
+    return (min(max(x, 0.0), 1.0), min(max(y, 0.0), 1.0))
+
+def shape_from_values(values, confidence=None):
+    """
+    Builds a shape from a flat list of numbers: (x, y[, conf]) or
+    (x1, y1, x2, y2[, conf]). A trailing value outside 0-1 is not a
+    confidence, so such tuples are rejected rather than guessed at.
+    """
+    if len(values) in (3, 5):
+        if not 0.0 <= values[-1] <= 1.0:
+            return None
+        values, confidence = values[:-1], values[-1]
+    if len(values) == 2:
+        return Point(values[0], values[1], confidence, _is_normalized(values))
+    if len(values) == 4:
+        x1, y1, x2, y2 = values
+        return Box(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2), confidence, _is_normalized(values))
+    return None
+
+def shape_from_json(item):
+    """Builds a shape from a structured answer entry (list of numbers or dict)."""
+    if isinstance(item, dict):
+        confidence = item.get('confidence', item.get('score'))
+        if 'polygon' in item:
+            points = [tuple(float(v) for v in p) for p in item['polygon']]
+            values = [v for p in points for v in p]
+            return Polygon(points, confidence, _is_normalized(values)) if len(points) >= 3 else None
+        for key in ('bbox', 'box', 'point'):
+            if key in item:
+                return shape_from_values([float(v) for v in item[key]], confidence)
+        if 'x' in item and 'y' in item:
+            return shape_from_values([float(item['x']), float(item['y'])], confidence)
+        return None
+    if isinstance(item, (list, tuple)) and item and isinstance(item[0], (list, tuple)):
+        points = [tuple(float(v) for v in p) for p in item]
+        values = [v for p in points for v in p]
+        return Polygon(points, None, _is_normalized(values)) if len(points) >= 3 else None
+    if isinstance(item, (list, tuple)):
+        return shape_from_values([float(v) for v in item])
+    return None
+
+class AnswerParser:
+    """
+    Incremental parser for RoboBrain's free-text answers.
+
+    Text can be fed in arbitrary chunks; a shape is emitted as soon as its
+    closing bracket arrives. Innermost bracket groups of numbers become
+    points (2 values) or boxes (4 values), optionally followed by a
+    confidence; a bracketed list of pairs introduced by the word "polygon"
+    becomes a single polygon.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.position = 0
+        self.open_brackets = []
+        self.polygon_start = None
+        self.polygon_points = []
+        self.pending = None
+        self.answer = RoboBrainAnswer()
+
+    def feed(self, text):
+        """Consumes the next chunk of answer text and returns the shapes it completed."""
+        self.buffer += text
+        self.answer.text = self.buffer
+        completed = []
+        while self.position < len(self.buffer):
+            char = self.buffer[self.position]
+            if self.pending is not None and not char.isspace():
+                completed.extend(self._finish_pending())
+            if char in '([':
+                if not self.open_brackets and POLYGON_PATTERN.search(self.buffer[max(0, self.position - 20):self.position]):
+                    self.polygon_start = self.position
+                    self.polygon_points = []
+                self.open_brackets.append(self.position)
+            elif char in ')]' and self.open_brackets:
+                start = self.open_brackets.pop()
+                completed.extend(self._close_group(start, self.position))
+            self.position += 1
+        return completed
+
+    def finish(self):
+        """Flushes a shape still waiting for a possible confidence and returns it, if any."""
+        if self.pending is None:
+            return []
+        return self._finish_pending(force=True)
+
+    def _close_group(self, start, end):
+        content = self.buffer[start + 1:end]
+        if self.polygon_start is not None:
+            if start == self.polygon_start:
+                points = self.polygon_points
+                self.polygon_start = None
+                self.polygon_points = []
+                if len(points) >= 3:
+                    values = [v for p in points for v in p]
+                    return self._emit(Polygon(points, None, _is_normalized(values)))
+            elif '(' not in content and '[' not in content:
+                values = self._numbers(content)
+                if values is not None and len(values) == 2:
+                    self.polygon_points.append(tuple(values))
+            return []
+
+        if '(' in content or '[' in content:
+            return []
+        values = self._numbers(content)
+        if values is None:
+            return []
+        shape = shape_from_values(values)
+        if shape is None:
+            return []
+        if shape.confidence is None:
+            # A confidence may still follow, e.g. "(120, 45) conf 0.9"; wait for the next token
+            self.pending = (shape, end + 1)
+            return []
+        return self._emit(shape)
+
+    def _finish_pending(self, force=False):
+        shape, start = self.pending
+        tail = self.buffer[start:]
+        match = CONFIDENCE_PATTERN.match(tail)
+        if not force:
+            # Not enough text yet to tell whether (or which) confidence follows
+            if match is None and re.fullmatch(r'\s*[,;]?\s*\(?\s*[A-Za-z]*\s*[:=]?\s*', tail):
+                return []
+            if match is not None and match.end() == len(tail):
+                return []
+        self.pending = None
+        if match:
+            shape.confidence = float(match.group(1))
+        return self._emit(shape)
+
+    def _emit(self, shape):
+        self.answer.shapes.append(shape)
+        return [shape]
+
+    @staticmethod
+    def _numbers(content):
+        """Numbers in a bracket group, or None if the group holds anything else (words, units)."""
+        parts = [p.strip() for p in re.split(r'[,\s;]+', content.strip()) if p.strip()]
+        if not parts or not all(NUMBER_PATTERN.fullmatch(p) for p in parts):
+            return None
+        return [float(p) for p in parts]
+
+def parse_answer(text):
+    parser = AnswerParser()
+    parser.feed(text)
+    parser.finish()
+    return parser.answer
+
+def parse_result(result):
+    """Parses a complete JSON response, preferring structured fields over the free-text answer."""
+    answer = parse_answer(result.get('answer', '') or '')
+    structured = []
+    for key in ('points', 'boxes', 'bboxes', 'polygons', 'objects'):
+        for item in result.get(key) or []:
+            shape = shape_from_json(item)
+            if shape is not None:
+                structured.append(shape)
+    if structured:
+        answer.shapes = structured
+    return answer
+
+def _stream_text(line, event_stream=False):
+    """
+    Answer text carried by one NDJSON or server-sent-event line. In an event
+    stream only data: fields carry text; event:, id:, retry: and ':' comment
+    (keepalive) lines are skipped.
+    """
+    if event_stream:
+        if not line.startswith('data:'):
+            return ''
+        line = line[5:]
+    line = line.strip()
+    if not line or line == '[DONE]':
+        return ''
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return line
+    if isinstance(event, dict):
+        return event.get('delta') or event.get('token') or event.get('text') or ''
+    return ''
+
+def read_answer(response, on_shape=None):
+    """
+    Reads a RoboBrain answer from a requests response opened with stream=True.
+
+    Streaming responses (NDJSON or server-sent events) are parsed as they
+    arrive and on_shape is called for each shape the moment it is complete,
+    so the first target can be used before the rest of the answer lands.
+    Plain JSON responses are parsed once the body is complete, without
+    calling on_shape.
+    """
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if content_type not in STREAMING_CONTENT_TYPES:
+        return parse_result(response.json())
+
+    event_stream = content_type == 'text/event-stream'
+    parser = AnswerParser()
+    for line in response.iter_lines(decode_unicode=True):
+        shapes = parser.feed(_stream_text(line, event_stream))
+        if on_shape:
+            for shape in shapes:
+                on_shape(shape)
+    for shape in parser.finish():
+        if on_shape:
+            on_shape(shape)
+    return parser.answer
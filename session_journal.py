@@ -0,0 +1,191 @@
+# session_journal.py
+
+import json
+import os
+import threading
+import time
+import cv2
+
+class SessionState:
+    """What a replayed journal says the app was doing when it stopped."""
+
+    def __init__(self):
+        self.appliance_key = None
+        self.appliance_id = None
+        self.verified_image_id = None
+        self.verified_at = None
+        self.verified_frame_path = None
+        self.behaviour_sequence = []
+        self.current_step = None
+        self.queued_steps = []
+        self.complete = False
+
+    @property
+    def resumable(self):
+        return bool(self.appliance_key) and not self.complete and (self.current_step is not None or bool(self.queued_steps))
+
+    def verified_image_valid(self, max_age):
+        """True when the verification is recent enough to reuse its image ID without asking RoboBrain again."""
+        if not self.verified_image_id or self.verified_at is None:
+            return False
+        if self.verified_frame_path is None or not os.path.exists(self.verified_frame_path):
+            return False
+        return time.time() - self.verified_at <= max_age
+
+    def load_verified_frame(self):
+        if self.verified_frame_path is None:
+            return None
+        return cv2.imread(self.verified_frame_path)
+
+class SessionJournal:
+    """
+    Append-only JSON-lines journal of the in-progress step sequence.
+
+    Every step transition is written (and fsynced) before the GUI acts on
+    it, so after a crash replay() rebuilds the exact step, the remaining
+    queue and the verified image ID. Target points are not journalled: the
+    TargetCache already persists them and re-anchors them to the live view.
+    Each line is self-contained; a torn last line from a crash mid-write is
+    ignored.
+    """
+
+    def __init__(self, directory=None, fsync=True, compact_after=500):
+        if directory is None:
+            directory = os.path.join(os.path.dirname(__file__), 'session')
+        self.directory = directory
+        self.path = os.path.join(directory, 'journal.jsonl')
+        self.frame_path = os.path.join(directory, 'verified.jpg')
+        self.fsync = fsync
+        self.compact_after = compact_after
+        self.lock = threading.Lock()
+        self.line_count = None
+
+    def _append(self, entries, mode='a', path=None):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path or self.path, mode, encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, default=str) + '\n')
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def record(self, event, **fields):
+        entry = {"event": event, "time": time.time(), **fields}
+        with self.lock:
+            try:
+                self._append([entry])
+            except OSError as e:
+                print(f"Failed to write session journal: {e}")
+                return
+            if self.line_count is None:
+                self.line_count = self._count_lines()
+            else:
+                self.line_count += 1
+            if self.line_count > self.compact_after:
+                self._compact()
+
+    def start_session(self, appliance_key, appliance_id):
+        """Starts a new journal; whatever was recorded before is discarded."""
+        entry = {"event": "appliance_loaded", "time": time.time(), "appliance_key": appliance_key, "appliance_id": appliance_id}
+        with self.lock:
+            try:
+                self._append([entry], mode='w')
+                self.line_count = 1
+            except OSError as e:
+                print(f"Failed to write session journal: {e}")
+
+    def record_verification(self, image_id, frame=None, verified_at=None):
+        """
+        Keeps the verified frame next to the journal so RoboBrain points can
+        be mapped after a restart. Pass verified_at (and no frame) to carry a
+        reused verification over without extending its age.
+        """
+        if frame is not None:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                cv2.imwrite(self.frame_path, frame)
+            except (OSError, cv2.error) as e:
+                print(f"Failed to save verified frame: {e}")
+        self.record("verified", image_id=image_id, frame_path=self.frame_path,
+                    verified_at=verified_at if verified_at is not None else time.time())
+
+    def replay(self):
+        """Rebuilds the last recorded SessionState, or None when there is no journal."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Failed to read session journal: {e}")
+            return None
+
+        state = SessionState()
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            self._apply(state, entry)
+        return state if state.appliance_key else None
+
+    @staticmethod
+    def _apply(state, entry):
+        event = entry.get("event")
+        if event == "appliance_loaded":
+            state.__init__()
+            state.appliance_key = entry.get("appliance_key")
+            state.appliance_id = entry.get("appliance_id")
+        elif event == "verified":
+            state.verified_image_id = entry.get("image_id")
+            state.verified_at = entry.get("verified_at", entry.get("time"))
+            state.verified_frame_path = entry.get("frame_path")
+        elif event == "steps":
+            state.behaviour_sequence = entry.get("sequence", [])
+            state.current_step = entry.get("current_step")
+            state.queued_steps = entry.get("queue", [])
+            state.complete = False
+        elif event == "sequence_complete":
+            state.complete = True
+
+    def _count_lines(self):
+        try:
+            with open(self.path, 'rb') as f:
+                return sum(1 for _ in f)
+        except OSError:
+            return 0
+
+    def _compact(self):
+        """Rewrites the journal as the minimal set of entries that replay to the same state."""
+        state = self.replay()
+        if state is None:
+            return
+        now = time.time()
+        entries = [{"event": "appliance_loaded", "time": now, "appliance_key": state.appliance_key, "appliance_id": state.appliance_id}]
+        if state.verified_image_id:
+            entries.append({"event": "verified", "time": now, "verified_at": state.verified_at,
+                            "image_id": state.verified_image_id, "frame_path": state.verified_frame_path})
+        entries.append({"event": "steps", "time": now, "sequence": state.behaviour_sequence,
+                        "current_step": state.current_step, "queue": state.queued_steps})
+        if state.complete:
+            entries.append({"event": "sequence_complete", "time": now})
+
+        temp_path = self.path + '.tmp'
+        try:
+            self._append(entries, mode='w', path=temp_path)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Failed to compact session journal: {e}")
+            return
+        self.line_count = len(entries)
+
+    def clear(self):
+        with self.lock:
+            for path in (self.path, self.frame_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"Failed to clear session journal: {e}")
+            self.line_count = 0
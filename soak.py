@@ -0,0 +1,230 @@
+# soak.py
+#
+# Long-running memory soak test. Drives the GUI from a recorded video with the
+# Gemini and RoboBrain calls stubbed out, samples process memory, traced Python
+# memory, gc object counts, threads and Tk widgets/images over time, and fails
+# when any of them keeps growing past its threshold.
+# Usage: python soak.py VIDEO [--appliance microwave] [--duration 14400] [--sample-interval 60] [--csv soak.csv]
+
+import argparse
+import csv
+import gc
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from ontology_registry import ONTOLOGY_OPTIONS
+
+# Allowed growth between the start (after warm-up) and the end of the run
+DEFAULT_THRESHOLDS = {
+    "rss_mb": 50.0,
+    "traced_mb": 20.0,
+    "gc_objects": 20000,
+    "threads": 2,
+    "tk_widgets": 50,
+    "tk_images": 2,
+}
+
+def read_rss_mb():
+    """Resident set size of this process in MB, or None where it cannot be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+class SoakMonitor:
+    """
+    Keeps the metric samples of a soak run and judges their growth.
+
+    Samples taken during warm-up (models loading, caches filling) are kept for
+    the report but not judged. Growth is the median of the last `window`
+    samples minus the median of the first `window` samples after warm-up, so
+    a single spike at either end does not decide the result.
+    """
+
+    def __init__(self, thresholds=None, warmup=0.0, window=3):
+        self.thresholds = dict(DEFAULT_THRESHOLDS if thresholds is None else thresholds)
+        self.warmup = warmup
+        self.window = window
+        self.samples = []
+
+    def add(self, elapsed, metrics):
+        self.samples.append((elapsed, dict(metrics)))
+
+    @staticmethod
+    def _median(values):
+        values = sorted(values)
+        middle = len(values) // 2
+        return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+    def growth(self):
+        """{metric: (start, end, growth)} for every metric with enough samples after warm-up."""
+        judged = [metrics for elapsed, metrics in self.samples if elapsed >= self.warmup]
+        if len(judged) < 2:
+            return {}
+        window = max(1, min(self.window, len(judged) // 2))
+        result = {}
+        for name in judged[0]:
+            first = [metrics[name] for metrics in judged[:window] if metrics.get(name) is not None]
+            last = [metrics[name] for metrics in judged[-window:] if metrics.get(name) is not None]
+            if first and last:
+                start, end = self._median(first), self._median(last)
+                result[name] = (start, end, end - start)
+        return result
+
+    def failures(self):
+        return [
+            f"{name} grew by {growth:.1f} ({start:.1f} -> {end:.1f}), limit {self.thresholds[name]}"
+            for name, (start, end, growth) in self.growth().items()
+            if name in self.thresholds and growth > self.thresholds[name]
+        ]
+
+    def write_csv(self, path):
+        names = sorted({name for _, metrics in self.samples for name in metrics})
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["elapsed_s"] + names)
+            for elapsed, metrics in self.samples:
+                writer.writerow([f"{elapsed:.1f}"] + [metrics.get(name) for name in names])
+
+def stub_apis(gui_module, app, appliance_key, target):
+    """Replaces the Gemini, RoboBrain and dialog calls so the soak needs no network or clicks."""
+    def report(title, message, *args, **kwargs):
+        print(f"[soak] dialog suppressed: {title}: {message}")
+
+    gui_module.messagebox = SimpleNamespace(showinfo=report, showwarning=report, showerror=report,
+                                            askyesno=lambda *args, **kwargs: False)
+    verifications = iter(range(1, sys.maxsize))
+    app._run_detection_task = lambda task, frame: appliance_key
+    app._run_verification_task = lambda task, frame, appliance_id: (f"soak-{next(verifications)}", frame)
+    app.get_coordinates_from_roborain = lambda prompt, on_target=None, timeout=20: [target]
+
+class SoakDriver:
+    """Steps through the appliance's sequence over and over, as a user touching each target would."""
+
+    def __init__(self, app, step_interval):
+        self.app = app
+        self.step_interval_ms = int(step_interval * 1000)
+        self.cycles = 0
+        self.touches = 0
+
+    def start(self):
+        self.app.after(self.step_interval_ms, self._tick)
+
+    def _tick(self):
+        app = self.app
+        if app.current_step is not None:
+            app.interaction_queue.put({"type": "TOUCH_DETECTED", "hand_id": 0, "handedness": None,
+                                       "point": None, "target": None})
+            self.touches += 1
+        elif app.scheduler.active_count() == 0:
+            # Sequence finished (or not started): detect again, which reloads the ontology
+            self.cycles += 1
+            app.detect_object()
+        app.after(self.step_interval_ms, self._tick)
+
+def sample_metrics(app):
+    gc.collect()
+    traced, _ = tracemalloc.get_traced_memory()
+    return {
+        "rss_mb": read_rss_mb(),
+        "traced_mb": traced / (1024 * 1024),
+        "gc_objects": len(gc.get_objects()),
+        "threads": threading.active_count(),
+        "tk_widgets": count_widgets(app),
+        "tk_images": len(app.tk.splitlist(app.tk.call("image", "names"))),
+        "terminal_lines": int(app.terminal_text.index("end-1c").split(".")[0]),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the GUI from a recorded video and fail on memory growth.")
+    parser.add_argument("video", help="recorded video file, replayed in a loop as the camera")
+    parser.add_argument("--appliance", default="microwave", choices=sorted(ONTOLOGY_OPTIONS),
+                        help="ontology key the stubbed detection returns")
+    parser.add_argument("--duration", type=float, default=4 * 3600, help="run time in seconds")
+    parser.add_argument("--warmup", type=float, default=120, help="seconds before growth is measured")
+    parser.add_argument("--sample-interval", type=float, default=60)
+    parser.add_argument("--step-interval", type=float, default=2, help="seconds between simulated touches")
+    parser.add_argument("--csv", help="write every sample to this CSV file")
+    for name, limit in DEFAULT_THRESHOLDS.items():
+        parser.add_argument(f"--max-{name.replace('_', '-')}", type=float, default=limit, dest=f"max_{name}")
+    args = parser.parse_args(argv)
+
+    import cv2
+    video = cv2.VideoCapture(args.video)
+    if not video.isOpened():
+        parser.error(f"cannot open video: {args.video}")
+    video.release()
+
+    tracemalloc.start()
+    import gui
+    from session_journal import SessionJournal
+    from target_cache import TargetCache
+
+    app = gui.ApplianceControlGUI(camera_source=args.video, loop_video=True)
+
+    work_dir = tempfile.TemporaryDirectory(prefix="soak-")
+    app.journal = SessionJournal(os.path.join(work_dir.name, "session"), fsync=False)
+    app.target_cache = TargetCache(os.path.join(work_dir.name, "target_cache"))
+    stub_apis(gui, app, args.appliance, (0.5, 0.5))
+
+    thresholds = {name: getattr(args, f"max_{name}") for name in DEFAULT_THRESHOLDS}
+    monitor = SoakMonitor(thresholds, warmup=args.warmup)
+    driver = SoakDriver(app, args.step_interval)
+    start_time = time.monotonic()
+    snapshots = {}
+
+    def sample():
+        elapsed = time.monotonic() - start_time
+        metrics = sample_metrics(app)
+        monitor.add(elapsed, metrics)
+        if "start" not in snapshots and elapsed >= args.warmup:
+            snapshots["start"] = tracemalloc.take_snapshot()
+        summary = ", ".join(f"{name}={value:.1f}" for name, value in metrics.items() if value is not None)
+        # The GUI owns sys.stdout while it runs; progress goes to the real console
+        print(f"[soak] {elapsed:7.0f}s cycles={driver.cycles} touches={driver.touches} {summary}",
+              file=sys.__stdout__, flush=True)
+        if elapsed >= args.duration:
+            snapshots["end"] = tracemalloc.take_snapshot()
+            app.on_closing()
+            return
+        app.after(int(args.sample_interval * 1000), sample)
+
+    driver.start()
+    app.after(0, sample)
+    app.mainloop()
+
+    if args.csv:
+        monitor.write_csv(args.csv)
+
+    print("Soak test growth after warm-up:")
+    for name, (start, end, growth) in monitor.growth().items():
+        print(f"  {name:<16}{start:12.1f} -> {end:12.1f}  ({growth:+.1f})")
+
+    failures = monitor.failures()
+    if failures and "start" in snapshots and "end" in snapshots:
+        print("Largest traced allocations since warm-up:")
+        for stat in snapshots["end"].compare_to(snapshots["start"], "lineno")[:10]:
+            print(f"  {stat}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    work_dir.cleanup()
+    if not failures:
+        print("PASS: memory, objects and threads stayed flat.")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
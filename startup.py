@@ -0,0 +1,95 @@
+# startup.py
+
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+
+class StartupProfiler:
+    """Collects how long each part of application start-up takes and prints a breakdown."""
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.lock = threading.Lock()
+        self.sections = []
+        self.marks = []
+        self.background = []
+        self.reported = False
+
+    @contextmanager
+    def section(self, name):
+        section_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.sections.append((name, time.perf_counter() - section_start))
+
+    def mark(self, name):
+        """Records the time since start-up at which a milestone was reached."""
+        with self.lock:
+            self.marks.append((name, time.perf_counter() - self.start_time))
+
+    def record_background(self, name, duration):
+        with self.lock:
+            self.background.append((name, duration))
+        if self.reported:
+            print(f"[startup] background: {name} ready after {duration * 1000:.0f} ms")
+
+    def report(self):
+        with self.lock:
+            lines = ["[startup] Start-up time breakdown:"]
+            lines += [f"  {name:<32}{duration * 1000:8.0f} ms" for name, duration in self.sections]
+            lines += [f"  @ {name:<30}{elapsed * 1000:8.0f} ms" for name, elapsed in self.marks]
+            lines += [f"  background: {name:<20}{duration * 1000:8.0f} ms" for name, duration in self.background]
+            self.reported = True
+        print("\n".join(lines))
+
+startup_profile = StartupProfiler()
+
+class LazyResource:
+    """
+    A heavy object (SDK client, model, module) built on first use.
+
+    get() builds it at most once, even when called from several threads;
+    preload() builds it on a daemon thread so it is usually ready before
+    anyone asks. A failed build is not cached, so the next get() retries.
+    """
+
+    def __init__(self, name, factory, profiler=startup_profile):
+        self.name = name
+        self.factory = factory
+        self.profiler = profiler
+        self.lock = threading.Lock()
+        self.value = None
+        self.loaded = False
+
+    def get(self):
+        if self.loaded:
+            return self.value
+        with self.lock:
+            if not self.loaded:
+                load_start = time.perf_counter()
+                self.value = self.factory()
+                self.loaded = True
+                self.profiler.record_background(self.name, time.perf_counter() - load_start)
+        return self.value
+
+    def preload(self, on_error=None):
+        threading.Thread(target=self._preload, args=(on_error,), name=f"Preload-{self.name}", daemon=True).start()
+
+    def _preload(self, on_error):
+        try:
+            self.get()
+        except Exception as e:
+            print(f"Failed to load {self.name}: {e}")
+            if on_error:
+                on_error(e)
+
+    def is_loaded(self):
+        return self.loaded
+
+mediapipe_solutions = LazyResource("mediapipe", lambda: importlib.import_module("mediapipe").solutions)
+rdflib_module = LazyResource("rdflib", lambda: importlib.import_module("rdflib"))
+requests_module = LazyResource("requests", lambda: importlib.import_module("requests"))
+pil_modules = LazyResource("Pillow", lambda: (importlib.import_module("PIL.Image"), importlib.import_module("PIL.ImageTk")))
@@ -0,0 +1,186 @@
+# target_cache.py
+
+import json
+import os
+import threading
+import cv2
+import numpy as np
+
+class TargetCache:
+    """
+    Persistent cache of RoboBrain target points per appliance and function.
+
+    Each appliance keeps one reference image (the verified frame it was first
+    seen in) and every function's points stored normalized (0-1) to that
+    image. Lookups match ORB features between the reference and the current
+    frame and map the points through the resulting homography, so a cached
+    target lands on the right button even if the camera or appliance moved.
+    """
+
+    def __init__(self, cache_dir=None, min_inliers=15, ratio_test=0.75, feature_width=640):
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(__file__), 'target_cache')
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.min_inliers = min_inliers
+        self.ratio_test = ratio_test
+        self.feature_width = feature_width
+
+        self.lock = threading.Lock()
+        self.orb = cv2.ORB_create(nfeatures=1000)
+        self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+        self.reference_features = {}
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Target cache index is unreadable, starting empty: {e}")
+            return {}
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(temp_path, self.index_path)
+
+    def _features(self, frame):
+        """ORB keypoints (in full-frame pixels) and descriptors, computed on a downscaled copy."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        scale = min(1.0, self.feature_width / gray.shape[1])
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        keypoints, descriptors = self.orb.detectAndCompute(gray, None)
+        points = np.float32([kp.pt for kp in keypoints]) / scale if keypoints else np.empty((0, 2), np.float32)
+        return points, descriptors
+
+    def _reference_features(self, appliance_id):
+        if appliance_id not in self.reference_features:
+            entry = self.index.get(appliance_id)
+            if not entry:
+                return None
+            reference = cv2.imread(os.path.join(self.cache_dir, entry['reference']))
+            if reference is None:
+                return None
+            self.reference_features[appliance_id] = self._features(reference)
+        return self.reference_features[appliance_id]
+
+    def _homography(self, source_features, target_features):
+        """Homography mapping source pixels to target pixels, or None if the images do not match."""
+        source_points, source_descriptors = source_features
+        target_points, target_descriptors = target_features
+        if source_descriptors is None or target_descriptors is None:
+            return None
+        if len(source_descriptors) < 2 or len(target_descriptors) < 2:
+            return None
+
+        good = []
+        for pair in self.matcher.knnMatch(source_descriptors, target_descriptors, k=2):
+            if len(pair) == 2 and pair[0].distance < self.ratio_test * pair[1].distance:
+                good.append(pair[0])
+        if len(good) < self.min_inliers:
+            return None
+
+        src = source_points[[m.queryIdx for m in good]].reshape(-1, 1, 2)
+        dst = target_points[[m.trainIdx for m in good]].reshape(-1, 1, 2)
+        homography, mask = cv2.findHomography(src, dst, cv2.RANSAC, 5.0)
+        if homography is None or int(mask.sum()) < self.min_inliers:
+            return None
+        if not self._plausible(homography):
+            return None
+        return homography
+
+    @staticmethod
+    def _plausible(homography, max_scale=10.0, max_perspective=0.005):
+        """
+        RANSAC can fit a degenerate homography to chance matches between
+        unrelated views. A real camera move keeps the orientation (positive
+        determinant), changes the scale moderately and adds little perspective.
+        """
+        homography = homography / homography[2, 2]
+        det = homography[0, 0] * homography[1, 1] - homography[0, 1] * homography[1, 0]
+        if not 1.0 / max_scale <= det <= max_scale:
+            return False
+        return abs(homography[2, 0]) <= max_perspective and abs(homography[2, 1]) <= max_perspective
+
+    @staticmethod
+    def _transform(points, homography):
+        array = np.float32(points).reshape(-1, 1, 2)
+        return [tuple(p) for p in cv2.perspectiveTransform(array, homography).reshape(-1, 2)]
+
+    def map_points(self, normalized_points, source_frame, frame):
+        """
+        Maps points normalized to source_frame into pixel points in frame,
+        through a feature homography when the views match and by plain
+        scaling otherwise.
+        """
+        h, w = frame.shape[:2]
+        source_h, source_w = source_frame.shape[:2]
+        pixel_points = [(x * source_w, y * source_h) for x, y in normalized_points]
+        with self.lock:
+            homography = self._homography(self._features(source_frame), self._features(frame))
+        if homography is not None:
+            pixel_points = self._transform(pixel_points, homography)
+        else:
+            pixel_points = [(x * w / source_w, y * h / source_h) for x, y in pixel_points]
+        return [(int(round(x)), int(round(y))) for x, y in pixel_points]
+
+    def lookup(self, appliance_id, function_label, frame):
+        """Returns pixel points in frame for a cached target, or None on a miss."""
+        with self.lock:
+            entry = self.index.get(appliance_id)
+            if not entry or function_label not in entry['functions']:
+                return None
+            reference_features = self._reference_features(appliance_id)
+            if reference_features is None:
+                return None
+            homography = self._homography(reference_features, self._features(frame))
+            if homography is None:
+                print(f"Cached targets for '{appliance_id}' do not match the current view.")
+                return None
+
+            ref_w, ref_h = entry['size']
+            pixel_points = [(x * ref_w, y * ref_h) for x, y in entry['functions'][function_label]]
+
+        h, w = frame.shape[:2]
+        points = []
+        for x, y in self._transform(pixel_points, homography):
+            if 0 <= x < w and 0 <= y < h:
+                points.append((int(round(x)), int(round(y))))
+        return points or None
+
+    def store(self, appliance_id, function_label, verified_frame, normalized_points):
+        """Caches points normalized to verified_frame, re-anchoring them to the appliance's reference image."""
+        if not normalized_points:
+            return
+        with self.lock:
+            entry = self.index.get(appliance_id)
+            verified_features = self._features(verified_frame)
+            reference_features = self._reference_features(appliance_id) if entry else None
+            homography = self._homography(verified_features, reference_features) if reference_features else None
+
+            if homography is None:
+                # First sighting, or the old reference no longer matches: start over from this frame
+                h, w = verified_frame.shape[:2]
+                entry = {'reference': f"{appliance_id}.jpg", 'size': [w, h], 'functions': {}}
+                os.makedirs(self.cache_dir, exist_ok=True)
+                cv2.imwrite(os.path.join(self.cache_dir, entry['reference']), verified_frame)
+                self.index[appliance_id] = entry
+                self.reference_features[appliance_id] = verified_features
+                points = [[float(x), float(y)] for x, y in normalized_points]
+            else:
+                verified_h, verified_w = verified_frame.shape[:2]
+                ref_w, ref_h = entry['size']
+                pixel_points = [(x * verified_w, y * verified_h) for x, y in normalized_points]
+                points = [[float(x / ref_w), float(y / ref_h)] for x, y in self._transform(pixel_points, homography)]
+
+            entry['functions'][function_label] = points
+            try:
+                self._save_index()
+            except OSError as e:
+                print(f"Failed to save target cache: {e}")
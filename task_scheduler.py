@@ -0,0 +1,153 @@
+# task_scheduler.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class TaskCancelled(Exception):
+    """Raised inside a task that was superseded or cancelled; it is dropped silently."""
+
+class TaskDeadlineExceeded(TaskCancelled):
+    """Raised inside a task that is still wanted but ran past its deadline; it is reported to on_error."""
+
+class Task:
+    """Handle passed to every task function so long-running work can check whether it is still wanted."""
+
+    def __init__(self, scheduler, kind, seq, generation, deadline):
+        self.scheduler = scheduler
+        self.kind = kind
+        self.seq = seq
+        self.generation = generation
+        self.deadline = deadline
+        self.future = None
+
+    def is_current(self):
+        return self.scheduler._is_current(self)
+
+    def remaining(self, default=None):
+        """Seconds left before the deadline (never negative), or default when there is none."""
+        if self.deadline is None:
+            return default
+        return max(0.0, self.deadline - time.monotonic())
+
+    def timeout(self, limit):
+        """A network timeout that respects both limit and the task's deadline."""
+        return min(limit, self.remaining(limit))
+
+    def check(self):
+        if not self.is_current():
+            raise TaskCancelled(f"Task '{self.kind}' was superseded or cancelled.")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise TaskDeadlineExceeded(f"Task '{self.kind}' missed its deadline.")
+
+class TaskScheduler:
+    """
+    Runs background work (API calls) on a bounded thread pool.
+
+    Tasks are grouped by kind and the latest submission of a kind wins: a
+    queued task of the same kind is dropped, and a running one is left to
+    finish but its result is discarded. cancel_all() does the same for
+    every kind, e.g. when the appliance changes. Results and errors are
+    handed to dispatch (the GUI passes a wrapper around Tk's after()) and
+    are re-checked there, so a superseded result never reaches the GUI.
+    """
+
+    def __init__(self, max_workers=2, dispatch=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="TaskWorker")
+        self.dispatch = dispatch or (lambda callback, *args: callback(*args))
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.latest_seq = {}
+        self.tasks = {}
+        self.next_seq = 0
+        self.closed = False
+
+    def submit(self, kind, fn, *args, on_result=None, on_error=None, deadline=None):
+        """
+        Schedules fn(task, *args). deadline is in seconds from now; a task
+        that has not started by then is skipped, and one that finishes later
+        has its result dropped. Either way on_error receives a
+        TaskDeadlineExceeded so the caller can reset whatever is waiting on it.
+        """
+        with self.lock:
+            if self.closed:
+                return None
+            self.next_seq += 1
+            task = Task(self, kind, self.next_seq, self.generation,
+                        time.monotonic() + deadline if deadline is not None else None)
+            self.latest_seq[kind] = task.seq
+            previous = self.tasks.get(kind)
+            self.tasks[kind] = task
+            task.future = self.executor.submit(self._run, task, fn, args, on_result, on_error)
+
+        if previous is not None and previous.future.cancel():
+            print(f"Dropped queued '{kind}' task in favour of a newer request.")
+        return task
+
+    def _run(self, task, fn, args, on_result, on_error):
+        try:
+            task.check()
+            result = fn(task, *args)
+            task.check()
+        except TaskDeadlineExceeded as e:
+            self._report_error(task, on_error, e)
+            return
+        except TaskCancelled as e:
+            print(f"Discarded '{task.kind}' task: {e}")
+            return
+        except Exception as e:
+            self._report_error(task, on_error, e)
+            return
+        finally:
+            self._forget(task)
+
+        if on_result:
+            self.dispatch(self._deliver, task, on_result, result)
+
+    def _report_error(self, task, on_error, e):
+        if on_error and task.is_current():
+            self.dispatch(self._deliver, task, on_error, e)
+        elif not on_error:
+            print(f"Error in '{task.kind}' task: {e}")
+
+    def _deliver(self, task, callback, value):
+        # Runs on the dispatch thread; the task may have been superseded while the callback was queued
+        if task.is_current():
+            callback(value)
+
+    def _is_current(self, task):
+        with self.lock:
+            return (not self.closed and task.generation == self.generation
+                    and self.latest_seq.get(task.kind) == task.seq)
+
+    def _forget(self, task):
+        with self.lock:
+            if self.tasks.get(task.kind) is task:
+                del self.tasks[task.kind]
+
+    def cancel(self, kind):
+        with self.lock:
+            self.next_seq += 1
+            self.latest_seq[kind] = self.next_seq
+            task = self.tasks.pop(kind, None)
+        if task is not None:
+            task.future.cancel()
+
+    def cancel_all(self):
+        """Invalidates every queued and running task."""
+        with self.lock:
+            self.generation += 1
+            tasks = list(self.tasks.values())
+            self.tasks = {}
+        for task in tasks:
+            task.future.cancel()
+
+    def active_count(self):
+        with self.lock:
+            return sum(1 for task in self.tasks.values() if not task.future.done())
+
+    def shutdown(self):
+        with self.lock:
+            self.closed = True
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
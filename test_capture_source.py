@@ -0,0 +1,187 @@
+# test_capture_source.py
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+import pytest
+
+from capture_source import CaptureSource
+
+BOUNDARY = "frame"
+
+class MJPEGStubHandler(BaseHTTPRequestHandler):
+    """Serves an endless multipart/x-mixed-replace stream like DroidCam's /video."""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.end_headers()
+        server = self.server
+        try:
+            while not server.stop_event.is_set():
+                image = np.full((120, 160, 3), server.frame_index % 255, dtype=np.uint8)
+                _, jpeg = cv2.imencode(".jpg", image)
+                data = jpeg.tobytes()
+                self.wfile.write(f"--{BOUNDARY}\r\n".encode())
+                self.wfile.write(b"Content-Type: image/jpeg\r\n")
+                self.wfile.write(f"Content-Length: {len(data)}\r\n\r\n".encode())
+                self.wfile.write(data)
+                self.wfile.write(b"\r\n")
+                server.frame_index += 1
+                if server.drop_after and server.frame_index % server.drop_after == 0:
+                    return
+                time.sleep(1 / server.fps)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def mjpeg_server():
+    def start(fps=30, drop_after=0):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), MJPEGStubHandler)
+        server.daemon_threads = True
+        server.stop_event = threading.Event()
+        server.frame_index = 0
+        server.fps = fps
+        server.drop_after = drop_after
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f"http://127.0.0.1:{server.server_address[1]}/video"
+
+    servers = []
+    yield start
+    for server in servers:
+        server.stop_event.set()
+        server.shutdown()
+        server.server_close()
+
+def open_or_skip(url, **kwargs):
+    source = CaptureSource(url, **kwargs)
+    if not source.isOpened():
+        source.release()
+        pytest.skip("OpenCV build cannot open HTTP MJPEG streams")
+    return source
+
+def test_network_source_is_live():
+    assert CaptureSource._is_live_source("http://192.168.1.5:4747/video")
+    assert CaptureSource._is_live_source(0)
+    assert not CaptureSource._is_live_source("recording.mp4")
+
+def test_reads_frames_and_measures_fps(mjpeg_server):
+    _, url = mjpeg_server(fps=30)
+    source = open_or_skip(url)
+    source.start()
+    try:
+        frames = []
+        deadline = time.monotonic() + 5
+        while len(frames) < 10 and time.monotonic() < deadline:
+            ret, frame = source.read(timeout=1.0)
+            if ret:
+                frames.append(frame)
+        assert len(frames) == 10
+        assert frames[0].shape == (120, 160, 3)
+        assert source.stats()["fps"] > 5
+    finally:
+        source.release()
+
+def test_slow_consumer_gets_fresh_frames(mjpeg_server):
+    server, url = mjpeg_server(fps=30)
+    source = open_or_skip(url)
+    source.start()
+    try:
+        source.read(timeout=2.0)
+        time.sleep(0.5)
+        ret, frame = source.read(timeout=1.0)
+        assert ret
+        # The stale frames queued while we slept were grabbed, not decoded
+        stats = source.stats()
+        assert stats["dropped"] > 5
+        assert abs(int(frame[0, 0, 0]) - server.frame_index % 255) <= 3
+    finally:
+        source.release()
+
+def test_reconnects_after_stream_drop(mjpeg_server):
+    _, url = mjpeg_server(fps=50, drop_after=10)
+    source = open_or_skip(url, reconnect_delay=0.05, max_failures=1)
+    source.start()
+    try:
+        deadline = time.monotonic() + 10
+        while source.reconnect_count < 1 and time.monotonic() < deadline:
+            source.read(timeout=0.2)
+        ret = False
+        while not ret and time.monotonic() < deadline:
+            ret, _ = source.read(timeout=0.5)
+        assert source.reconnect_count >= 1
+        assert ret
+    finally:
+        source.release()
+
+def test_looped_video_file_restarts_at_its_frame_rate(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 50, (32, 24))
+    for i in range(5):
+        writer.write(np.full((24, 32, 3), i * 50, dtype=np.uint8))
+    writer.release()
+
+    source = CaptureSource(path, loop=True)
+    if not source.isOpened():
+        pytest.skip("OpenCV build cannot read MJPG video files")
+    try:
+        start = time.monotonic()
+        values = []
+        for _ in range(12):
+            ret, frame = source.read()
+            assert ret
+            values.append(int(frame[0, 0, 0]))
+        # 12 frames at 50 fps, paced rather than decoded as fast as possible
+        assert time.monotonic() - start >= 0.18
+        assert abs(values[5] - values[0]) <= 3 and abs(values[10] - values[0]) <= 3
+        # File sources have no grab loop but still report the rate they are read at;
+        # the smoothed estimate is noisy over 12 frames, unpaced decoding would be in the thousands
+        stats = source.stats()
+        assert 10 < stats["fps"] < 200
+        assert stats["grabbed"] == stats["retrieved"] == 12 and stats["dropped"] == 0
+    finally:
+        source.release()
+
+class StalledCapture:
+    """Stands in for a network capture whose grab() blocks until unblocked."""
+
+    def __init__(self):
+        self.unblock = threading.Event()
+        self.in_grab = threading.Event()
+        self.released_during_grab = False
+        self.released = False
+
+    def isOpened(self):
+        return not self.released
+
+    def grab(self):
+        self.in_grab.set()
+        self.unblock.wait(5)
+        self.in_grab.clear()
+        return False
+
+    def release(self):
+        self.released_during_grab = self.in_grab.is_set()
+        self.released = True
+
+def test_release_never_closes_a_capture_that_is_still_grabbing():
+    source = CaptureSource("http://127.0.0.1:9/video", live=True)
+    stalled = StalledCapture()
+    source.cap = stalled
+    source.start()
+    assert stalled.in_grab.wait(2)
+
+    source.release(timeout=0.1)
+    assert not stalled.released
+
+    stalled.unblock.set()
+    source.grab_thread.join(2)
+    assert stalled.released
+    assert not stalled.released_during_grab
@@ -0,0 +1,44 @@
+# test_hand_state.py
+
+from hand_state import HandAssociator
+
+def test_ids_stay_with_hands_when_detection_order_swaps():
+    associator = HandAssociator()
+    left, right = associator.update([(0.2, 0.5), (0.8, 0.5)])
+
+    # MediaPipe may list the hands in either order; small movement keeps the IDs
+    second_right, second_left = associator.update([(0.78, 0.52), (0.22, 0.48)])
+    assert second_left.hand_id == left.hand_id
+    assert second_right.hand_id == right.hand_id
+    assert left.hand_id != right.hand_id
+
+def test_far_jump_gets_a_new_id():
+    associator = HandAssociator(max_match_distance=0.2)
+    first, = associator.update([(0.1, 0.1)])
+    second, = associator.update([(0.9, 0.9)])
+    assert second.hand_id != first.hand_id
+
+def test_hand_expires_after_max_missed_frames():
+    associator = HandAssociator(max_missed_frames=3)
+    hand, = associator.update([(0.5, 0.5)])
+    for _ in range(3):
+        associator.update([])
+    # Missed for exactly max_missed_frames: still remembered
+    assert associator.update([(0.5, 0.5)])[0].hand_id == hand.hand_id
+
+    for _ in range(4):
+        associator.update([])
+    assert hand.hand_id not in associator.hands
+    assert associator.update([(0.5, 0.5)])[0].hand_id != hand.hand_id
+
+def test_smoothing_history_is_per_hand():
+    associator = HandAssociator(history_size=2)
+    a, b = associator.update([(0.2, 0.5), (0.8, 0.5)])
+    a.update_fingertips((100, 100), (110, 100))
+    b.update_fingertips((500, 100), (510, 100))
+    a, b = associator.update([(0.2, 0.5), (0.8, 0.5)])
+    assert a.update_fingertips((102, 100), (112, 100)) == ((101, 100), (111, 100))
+    assert b.update_fingertips((504, 100), (514, 100)) == ((502, 100), (512, 100))
+
+    # The history is bounded: only the last history_size points are averaged
+    assert a.update_fingertips((110, 100), (120, 100)) == ((106, 100), (116, 100))
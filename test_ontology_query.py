@@ -0,0 +1,37 @@
+# test_ontology_query.py
+
+import os
+
+import pytest
+
+from bench_ontology_query import legacy_functions, legacy_steps
+from ontology_reader import OntologyReader
+from ontology_registry import ONTOLOGY_OPTIONS
+
+ONTOLOGY_DIR = os.path.join(os.path.dirname(__file__), 'ontologies')
+
+@pytest.mark.parametrize("key", sorted(ONTOLOGY_OPTIONS))
+def test_query_matches_legacy_reader_on_shipped_ontologies(key):
+    file, namespace_uri, appliance_id = ONTOLOGY_OPTIONS[key]
+    reader = OntologyReader()
+    namespace = reader.load_ontology_file(os.path.join(ONTOLOGY_DIR, file), namespace_uri)
+    graph = reader.ontology_graph
+    appliance = namespace[appliance_id]
+
+    expected_functions = legacy_functions(graph, appliance, namespace)
+    functions = reader.get_appliance_functions(appliance, namespace)
+    assert expected_functions
+    assert [(f["name"], f["implements_mp"], f["uri"]) for f in expected_functions] == \
+        [(f.name, f.implements_mp, f.uri) for f in functions]
+
+    expected_steps = legacy_steps(graph, appliance, namespace)
+    assert expected_steps
+    assert [step.as_step() for step in reader.get_step_sequence(appliance, namespace)] == expected_steps
+
+    # The GUI walks the chain one step at a time
+    steps = []
+    step = reader.get_first_step(appliance, namespace)
+    while step:
+        steps.append(step)
+        step = reader.get_next_step(step["step_uri"], namespace)
+    assert steps == expected_steps
@@ -0,0 +1,103 @@
+# test_ontology_validator.py
+
+import os
+
+from ontology_registry import ONTOLOGY_OPTIONS
+from ontology_validator import main, validate_directory, validate_file
+
+ONTOLOGY_DIR = os.path.join(os.path.dirname(__file__), 'ontologies')
+
+HEADER = """@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix : <http://www.example.org/toaster_ontology#> .
+
+:Appliance a owl:Class .
+:Toaster a owl:Class ; rdfs:subClassOf :Appliance .
+:Function a owl:Class .
+:Step a owl:Class .
+:hasStep rdfs:domain :Appliance .
+"""
+
+REGISTRY_ENTRY = ("toaster", "http://www.example.org/toaster_ontology#", "toaster")
+
+def write(tmp_path, body):
+    path = tmp_path / "toaster_ontology.ttl"
+    path.write_text(HEADER + body, encoding="utf-8")
+    return str(path)
+
+def test_shipped_ontologies_are_valid():
+    reports = list(validate_directory(ONTOLOGY_DIR, workers=1))
+    assert len(reports) == 4
+    assert [r.errors for r in reports] == [[], [], [], []]
+
+def test_detects_cycle_and_missing_function_fields(tmp_path):
+    path = write(tmp_path, """
+:toaster a :Toaster ; :hasFunction :lever ; :hasStep :step1 .
+:lever a :Function .
+:step1 a :Step ; :isFunctionOf :lever ; :nextStep :step2 .
+:step2 a :Step ; :nextStep :step1 .
+""")
+    errors = validate_file(path, REGISTRY_ENTRY).errors
+    assert "function :lever has no rdfs:label" in errors
+    assert "function :lever has no :implements_mp" in errors
+    assert "step :step2 has no :isFunctionOf, the sequence stops here" in errors
+    assert "step chain has a cycle: step1 -> step2 -> step1" in errors
+
+def test_checks_orphan_steps_and_functions(tmp_path):
+    path = write(tmp_path, """
+:toaster a :Toaster ; :hasFunction :lever ; :hasStep :step1 .
+:lever a :Function ; rdfs:label "Lever" ; :implements_mp "press_button" .
+:step1 a :Step ; :isFunctionOf :lever .
+:step8 a :Step ; :isFunctionOf :lever .
+:step9 a :Step .
+:dial a :Function .
+""")
+    report = validate_file(path, REGISTRY_ENTRY)
+    assert not report.ok
+    assert sorted(report.errors) == [
+        "function :dial has no :implements_mp",
+        "function :dial has no rdfs:label",
+        "step :step9 has no :isFunctionOf",
+    ]
+    assert report.warnings == [
+        "step :step8 is not reachable from any appliance's :hasStep/:nextStep chain",
+        "step :step9 is not reachable from any appliance's :hasStep/:nextStep chain",
+    ]
+
+def test_registry_mismatch(tmp_path):
+    path = write(tmp_path, """
+:toaster a :Device ; :hasFunction :lever ; :hasStep :step1 .
+:lever a :Function ; rdfs:label "Lever" ; :implements_mp "press_button" .
+:step1 a :Step ; :isFunctionOf :lever .
+""")
+    errors = validate_file(path, ("toaster", "http://www.example.org/toaster_ontology#", "toast")).errors
+    assert errors == ["registered appliance individual :toast is not defined"]
+    errors = validate_file(path, REGISTRY_ENTRY).errors
+    assert errors == [":toaster is typed :Device, which is not a declared class"]
+
+def test_main_exit_code(tmp_path):
+    write(tmp_path, ":toaster a :Toaster .\n")
+    assert main([str(tmp_path), "--workers", "1"]) == 1
+    assert main([ONTOLOGY_DIR, "--workers", "2", "--quiet"]) == 0
+
+def test_clean_catalog_outside_the_gui_directory_passes(tmp_path, capsys):
+    write(tmp_path, """
+:toaster a :Toaster ; :hasFunction :lever ; :hasStep :step1 .
+:lever a :Function ; rdfs:label "Lever" ; :implements_mp "press_button" .
+:step1 a :Step ; :isFunctionOf :lever .
+""")
+    reports = list(validate_directory(str(tmp_path), workers=1))
+    assert [(r.errors, r.warnings) for r in reports] == [([], [])]
+    assert main([str(tmp_path), "--workers", "1", "--strict"]) == 0
+
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    assert main([str(empty), "--workers", "1"]) == 0
+
+def test_registry_check_can_be_forced(tmp_path):
+    write(tmp_path, ":toaster a :Toaster .\n")
+    reports = list(validate_directory(str(tmp_path), workers=1, check_registry=True))
+    missing = [r for r in reports if "registered in ontology_registry.py but the file does not exist" in r.errors]
+    assert len(missing) == len(ONTOLOGY_OPTIONS)
+    assert "file is not registered in ontology_registry.py" in reports[-1].warnings
@@ -0,0 +1,64 @@
+# test_overlay.py
+
+import threading
+from queue import Queue
+
+import cv2
+import numpy as np
+import pytest
+
+from overlay import OverlayLayer
+from video_threads import VideoCaptureThread
+
+RED = (0, 0, 255)
+
+def test_dot_is_scaled_from_capture_to_display_coordinates():
+    overlay = OverlayLayer(dot_radius=10, dot_color=RED)
+    overlay.update((1280, 720), [(640, 360), (1200, 100)], [])
+
+    display = np.zeros((480, 854, 3), dtype=np.uint8)
+    overlay.draw(display)
+
+    # 854/1280 and 480/720 are both 2/3: centers scale by that and the radius shrinks to 7 px
+    assert tuple(display[240, 427]) == RED
+    assert tuple(display[67, 800]) == RED
+    assert tuple(display[240, 427 + 7]) == RED
+    assert not display[240, 427 + 9].any()
+    assert not display[240 + 9, 427].any()
+
+def test_draw_without_annotations_leaves_image_untouched():
+    display = np.zeros((480, 854, 3), dtype=np.uint8)
+    OverlayLayer().draw(display)
+    assert not display.any()
+
+class NoHands:
+    def get_results(self):
+        return None
+
+def test_published_frame_stays_clean(tmp_path):
+    rng = np.random.default_rng(0)
+    image = cv2.GaussianBlur(rng.integers(0, 256, (240, 320, 3), dtype=np.uint8), (5, 5), 0)
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (320, 240))
+    for _ in range(5):
+        writer.write(image)
+    writer.release()
+
+    thread = VideoCaptureThread(path, Queue(), Queue(maxsize=2), NoHands(), threading.Event())
+    if not thread.cap.isOpened():
+        pytest.skip("OpenCV build cannot read MJPG video files")
+    first = thread.cap.read()[1]
+    thread.cap.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    thread.create_trackers([(160, 120)], first)
+    thread.run()
+
+    frame = thread.get_frame()
+    assert frame is not None
+    assert thread.overlay.tracker_centers, "the tracker dot should be in the overlay"
+
+    display = cv2.resize(thread.get_frame(copy=False), (213, 160))
+    thread.overlay.draw(display)
+    assert tuple(display[80, 106]) == RED
+    # Drawing on the display image never reaches the published frame
+    assert np.array_equal(thread.get_frame(), frame)
+    assert np.abs(frame.astype(int) - first.astype(int)).max() < 10
@@ -0,0 +1,58 @@
+# test_point_trackers.py
+
+import numpy as np
+import pytest
+
+from point_trackers import PointTracker, ReacquiringTracker, TemplatePointTracker, create_point_tracker
+
+BBOX = (100, 80, 24, 24)
+
+def textured_frame(seed=0, size=(240, 320)):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (*size, 3), dtype=np.uint8)
+
+def occluded(frame, bbox, seed=1):
+    """The target box covered by something unrelated, e.g. a hand."""
+    x, y, w, h = bbox
+    covered = frame.copy()
+    covered[y - 10:y + h + 10, x - 10:x + w + 10] = textured_frame(seed, (h + 20, w + 20))
+    return covered
+
+def test_trackers_share_the_interface():
+    with pytest.raises(TypeError):
+        PointTracker()
+    assert isinstance(create_point_tracker("template"), PointTracker)
+
+def test_target_is_reacquired_after_occlusion_and_shift():
+    frame = textured_frame()
+    tracker = ReacquiringTracker(TemplatePointTracker())
+    tracker.init(frame, BBOX)
+    assert tracker.update(frame) == (True, BBOX)
+
+    success, _ = tracker.update(occluded(frame, BBOX))
+    assert not success
+    assert tracker.is_lost()
+
+    # The camera moved while the target was hidden: further than the backend's own search reach
+    shifted = np.roll(frame, (30, 35), axis=(0, 1))
+    success, bbox = False, None
+    for _ in range(10):
+        success, bbox = tracker.update(shifted)
+        if success:
+            break
+    assert success
+    assert bbox == (BBOX[0] + 35, BBOX[1] + 30, 24, 24)
+    assert not tracker.is_lost()
+    assert tracker.update(shifted) == (True, bbox)
+
+def test_tracker_expires_after_max_lost_frames():
+    frame = textured_frame()
+    tracker = ReacquiringTracker(TemplatePointTracker(), max_lost_frames=5)
+    tracker.init(frame, BBOX)
+
+    covered = occluded(frame, BBOX)
+    for _ in range(5):
+        assert tracker.update(covered)[0] is False
+        assert not tracker.is_expired()
+    tracker.update(covered)
+    assert tracker.is_expired()
@@ -0,0 +1,78 @@
+# test_robobrain_response.py
+
+import json
+
+from robobrain_response import AnswerParser, Box, Point, Polygon, parse_answer, parse_result, read_answer
+
+class FakeResponse:
+    def __init__(self, content_type, body=None, lines=()):
+        self.headers = {'Content-Type': content_type}
+        self.body = body
+        self.lines = lines
+
+    def json(self):
+        return self.body
+
+    def iter_lines(self, decode_unicode=False):
+        yield from self.lines
+
+def test_parses_integer_float_and_negative_points():
+    answer = parse_answer("The button is at (120, 45), then (300.5,-2) and [0.25, 0.75].")
+    assert [(p.x, p.y) for p in answer.points] == [(120, 45), (300.5, -2), (0.25, 0.75)]
+    assert [p.normalized for p in answer.points] == [False, False, True]
+
+def test_parses_boxes_with_confidence():
+    answer = parse_answer("door handle [10, 20, 110, 220] conf 0.87 and (5, 6, 0.4)")
+    box, point = answer.shapes
+    assert isinstance(box, Box) and box.center == (60, 120) and box.confidence == 0.87
+    assert isinstance(point, Point) and point.confidence == 0.4
+
+def test_third_value_outside_unit_range_is_not_a_confidence():
+    answer = parse_answer("(120, 45, 300) and [10, 20, 110, 220, 87] but (5, 6, 1)")
+    assert len(answer.shapes) == 1
+    assert answer.shapes[0].center == (5, 6) and answer.shapes[0].confidence == 1.0
+
+def test_parses_polygon_and_ignores_words_in_brackets():
+    answer = parse_answer("press (the red one): polygon [(0,0), (10,0), (10,10), (0,10)]")
+    assert len(answer.shapes) == 1
+    assert isinstance(answer.shapes[0], Polygon) and answer.shapes[0].center == (5, 5)
+
+def test_normalized_targets_are_clamped():
+    answer = parse_answer("(320, 240) (-10, 500) (0.5, 0.25)")
+    assert answer.normalized_targets(640, 480) == [(0.5, 0.5), (0.0, 1.0), (0.5, 0.25)]
+
+def test_first_point_is_emitted_before_answer_completes():
+    parser = AnswerParser()
+    assert parser.feed("[(120, 45), (3") == [Point(120, 45)]
+    assert parser.feed("00, 10)]") == [Point(300, 10)]
+    assert parser.finish() == []
+
+def test_confidence_split_across_chunks():
+    parser = AnswerParser()
+    assert parser.feed("(1, 2) confidence: 0") == []
+    assert parser.feed(".9 ok") == [Point(1, 2, 0.9)]
+
+def test_structured_fields_take_precedence():
+    answer = parse_result({'answer': '(1, 2)', 'boxes': [{'bbox': [0, 0, 4, 4], 'score': 0.5}]})
+    assert answer.shapes == [Box(0, 0, 4, 4, 0.5)]
+
+def test_read_answer_streams_ndjson():
+    lines = [json.dumps({'delta': 'at (12'}), json.dumps({'delta': ', 34) and'}), '', json.dumps({'delta': ' (5, 6)'})]
+    seen = []
+    answer = read_answer(FakeResponse('application/x-ndjson', lines=lines), seen.append)
+    assert seen == [Point(12, 34), Point(5, 6)]
+    assert answer.text == 'at (12, 34) and (5, 6)'
+
+def test_read_answer_event_stream_reads_only_data_fields():
+    lines = ['event: delta', 'data: ' + json.dumps({'delta': 'button at (12, 34)'}), 'id: 7',
+             ': keepalive (1, 2)', 'retry: 3000', '', 'data: [DONE]']
+    seen = []
+    answer = read_answer(FakeResponse('text/event-stream', lines=lines), seen.append)
+    assert seen == [Point(12, 34)]
+    assert answer.text == 'button at (12, 34)'
+
+def test_read_answer_plain_json():
+    seen = []
+    answer = read_answer(FakeResponse('application/json', body={'answer': '(7, 8)'}), seen.append)
+    assert answer.points == [Point(7, 8)]
+    assert seen == []
@@ -0,0 +1,57 @@
+# test_session_journal.py
+
+import time
+import numpy as np
+
+from session_journal import SessionJournal
+
+STEP_A = {"step_uri": "http://www.example.org/toaster_ontology#step1", "function_name": "Lever", "implements_mp": "press_button"}
+STEP_B = {"step_uri": "http://www.example.org/toaster_ontology#step2", "function_name": "Dial", "implements_mp": "rotate"}
+
+def test_replay_restores_step_queue_and_verification(tmp_path):
+    journal = SessionJournal(str(tmp_path), fsync=False)
+    journal.start_session("toaster", "toaster")
+    journal.record_verification("img-1", np.zeros((8, 8, 3), dtype=np.uint8))
+    journal.record("steps", sequence=[STEP_A, STEP_B], current_step=STEP_A, queue=[STEP_B])
+
+    state = SessionJournal(str(tmp_path)).replay()
+    assert state.resumable
+    assert state.appliance_key == "toaster"
+    assert state.current_step == STEP_A
+    assert state.queued_steps == [STEP_B]
+    assert state.verified_image_valid(60)
+    assert not state.verified_image_valid(-1)
+    assert state.load_verified_frame().shape == (8, 8, 3)
+
+def test_torn_last_line_is_ignored(tmp_path):
+    journal = SessionJournal(str(tmp_path), fsync=False)
+    journal.start_session("toaster", "toaster")
+    journal.record("steps", sequence=[STEP_A], current_step=STEP_A, queue=[])
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"event": "steps", "current_step": nu')
+
+    assert journal.replay().current_step == STEP_A
+
+def test_completed_or_cleared_session_is_not_resumable(tmp_path):
+    journal = SessionJournal(str(tmp_path), fsync=False)
+    journal.start_session("toaster", "toaster")
+    journal.record("steps", sequence=[STEP_A], current_step=None, queue=[STEP_A])
+    journal.record("sequence_complete")
+    assert not journal.replay().resumable
+
+    journal.clear()
+    assert journal.replay() is None
+
+def test_compaction_preserves_state(tmp_path):
+    journal = SessionJournal(str(tmp_path), fsync=False, compact_after=10)
+    journal.start_session("toaster", "toaster")
+    journal.record("verified", image_id="img-1", frame_path=journal.frame_path, verified_at=time.time() - 100)
+    for i in range(25):
+        journal.record("steps", sequence=[STEP_A, STEP_B], current_step=STEP_A, queue=[STEP_B] * (i % 3))
+
+    with open(journal.path, encoding='utf-8') as f:
+        assert len(f.readlines()) <= 10
+    state = journal.replay()
+    assert state.queued_steps == [STEP_B] * (24 % 3)
+    assert state.verified_image_id == "img-1"
+    assert time.time() - state.verified_at >= 100
@@ -0,0 +1,48 @@
+# test_soak.py
+
+import sys
+
+import pytest
+
+from soak import SoakMonitor, main
+
+THRESHOLDS = {"rss_mb": 50, "threads": 2}
+
+def run(monitor, values, interval=60):
+    for i, metrics in enumerate(values):
+        monitor.add(i * interval, metrics)
+
+def test_flat_run_passes_and_warmup_is_not_judged():
+    monitor = SoakMonitor(THRESHOLDS, warmup=120)
+    # Models and caches load during warm-up, after that memory is flat
+    run(monitor, [{"rss_mb": 100, "threads": 3}, {"rss_mb": 400, "threads": 9}]
+        + [{"rss_mb": 400 + i % 2, "threads": 9} for i in range(20)])
+    assert monitor.failures() == []
+    assert monitor.growth()["threads"] == (9, 9, 0)
+
+def test_steady_growth_fails():
+    monitor = SoakMonitor(THRESHOLDS)
+    run(monitor, [{"rss_mb": 100 + 10 * i, "threads": 4} for i in range(20)])
+    failures = monitor.failures()
+    assert len(failures) == 1
+    assert failures[0].startswith("rss_mb grew by")
+
+def test_single_spike_does_not_fail():
+    monitor = SoakMonitor(THRESHOLDS)
+    values = [{"rss_mb": 100, "threads": 4} for _ in range(10)]
+    values[-1] = {"rss_mb": 500, "threads": 40}
+    run(monitor, values)
+    assert monitor.failures() == []
+
+def test_missing_metrics_are_skipped(tmp_path):
+    monitor = SoakMonitor(THRESHOLDS)
+    run(monitor, [{"rss_mb": None, "threads": 4}, {"rss_mb": None, "threads": 4}])
+    assert "rss_mb" not in monitor.growth()
+    path = tmp_path / "soak.csv"
+    monitor.write_csv(str(path))
+    assert path.read_text(encoding="utf-8").splitlines()[0] == "elapsed_s,rss_mb,threads"
+
+def test_unknown_appliance_is_rejected_before_the_gui_is_built(tmp_path):
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "clip.avi"), "--appliance", "toaster"])
+    assert "gui" not in sys.modules
@@ -0,0 +1,90 @@
+# test_startup.py
+
+import threading
+import time
+
+import pytest
+
+from startup import LazyResource, StartupProfiler
+
+def test_lazy_resource_builds_once_under_concurrent_get():
+    profiler = StartupProfiler()
+    builds = []
+
+    def factory():
+        builds.append(threading.current_thread().name)
+        time.sleep(0.05)
+        return object()
+
+    resource = LazyResource("model", factory, profiler=profiler)
+    start = threading.Barrier(8)
+    values = []
+
+    def get():
+        start.wait()
+        values.append(resource.get())
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert len(values) == 8 and all(value is values[0] for value in values)
+    assert resource.is_loaded()
+    assert [name for name, _ in profiler.background] == ["model"]
+
+def test_lazy_resource_retries_after_a_failed_build():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("not yet")
+        return "client"
+
+    resource = LazyResource("client", factory, profiler=StartupProfiler())
+    with pytest.raises(ConnectionError):
+        resource.get()
+    assert not resource.is_loaded()
+    assert resource.get() == "client"
+    assert resource.get() == "client"
+    assert len(attempts) == 2
+
+def test_preload_reports_failures_to_on_error():
+    def factory():
+        raise ImportError("missing")
+
+    resource = LazyResource("missing", factory, profiler=StartupProfiler())
+    failed = threading.Event()
+    errors = []
+    resource.preload(on_error=lambda e: (errors.append(e), failed.set()))
+    assert failed.wait(2)
+    assert isinstance(errors[0], ImportError)
+    assert not resource.is_loaded()
+
+def test_profiler_records_sections_marks_and_background(capsys):
+    profiler = StartupProfiler()
+    with profiler.section("load ontology"):
+        time.sleep(0.01)
+    with pytest.raises(ValueError):
+        with profiler.section("failing step"):
+            raise ValueError("still timed")
+    profiler.mark("window ready")
+    profiler.record_background("rdflib", 0.2)
+
+    assert [name for name, _ in profiler.sections] == ["load ontology", "failing step"]
+    assert profiler.sections[0][1] >= 0.01
+    assert [name for name, _ in profiler.marks] == ["window ready"]
+    assert profiler.background == [("rdflib", 0.2)]
+
+    assert not profiler.reported
+    profiler.report()
+    assert profiler.reported
+    report = capsys.readouterr().out
+    assert "load ontology" in report and "@ window ready" in report and "background: rdflib" in report
+
+    # Resources that finish after the report are printed as they arrive
+    profiler.record_background("mediapipe", 1.5)
+    assert "mediapipe ready after 1500 ms" in capsys.readouterr().out
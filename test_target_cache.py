@@ -0,0 +1,93 @@
+# test_target_cache.py
+
+import math
+
+import cv2
+import numpy as np
+
+from target_cache import TargetCache
+
+# A mild perspective change, like the camera having been nudged
+WARP = np.array([[0.95, 0.05, 20.0],
+                 [-0.04, 0.97, 15.0],
+                 [0.00002, 0.00001, 1.0]])
+
+def textured_scene(seed=0, size=(480, 640)):
+    """Random shapes give ORB plenty of distinctive corners."""
+    rng = np.random.default_rng(seed)
+    h, w = size
+    image = np.full((h, w, 3), 40, dtype=np.uint8)
+    for _ in range(150):
+        color = [int(c) for c in rng.integers(0, 256, 3)]
+        x, y = int(rng.integers(0, w)), int(rng.integers(0, h))
+        if rng.random() < 0.5:
+            cv2.rectangle(image, (x, y), (x + int(rng.integers(10, 60)), y + int(rng.integers(10, 60))), color, -1)
+        else:
+            cv2.circle(image, (x, y), int(rng.integers(5, 30)), color, -1)
+    return image
+
+def warped(image, homography=WARP):
+    h, w = image.shape[:2]
+    return cv2.warpPerspective(image, homography, (w, h))
+
+def warp_point(point, homography=WARP):
+    x, y = point
+    mapped = homography @ np.array([x, y, 1.0])
+    return mapped[0] / mapped[2], mapped[1] / mapped[2]
+
+def assert_close(point, expected, tolerance=4):
+    assert math.dist(point, expected) <= tolerance, (point, expected)
+
+def test_lookup_maps_cached_points_onto_a_moved_view(tmp_path):
+    scene = textured_scene()
+    cache = TargetCache(str(tmp_path))
+    cache.store("microwave", "Start", scene, [(0.5, 0.5)])
+
+    points = cache.lookup("microwave", "Start", warped(scene))
+    assert len(points) == 1
+    assert_close(points[0], warp_point((320, 240)))
+
+    assert cache.lookup("microwave", "Stop", warped(scene)) is None
+    assert cache.lookup("kettle", "Start", warped(scene)) is None
+
+def test_non_matching_view_misses(tmp_path):
+    cache = TargetCache(str(tmp_path))
+    cache.store("microwave", "Start", textured_scene(0), [(0.5, 0.5)])
+    assert cache.lookup("microwave", "Start", textured_scene(1)) is None
+
+def test_store_reanchors_points_to_the_reference(tmp_path):
+    scene = textured_scene()
+    cache = TargetCache(str(tmp_path))
+    cache.store("microwave", "Start", scene, [(0.5, 0.5)])
+
+    # Verified from a moved camera: stored relative to the original reference image
+    x, y = warp_point((160, 120))
+    cache.store("microwave", "Stop", warped(scene), [(x / 640, y / 480)])
+    (stop_x, stop_y), = cache.index["microwave"]["functions"]["Stop"]
+    assert_close((stop_x * 640, stop_y * 480), (160, 120))
+    assert "Start" in cache.index["microwave"]["functions"]
+
+def test_reference_resets_when_the_view_no_longer_matches(tmp_path):
+    cache = TargetCache(str(tmp_path))
+    cache.store("microwave", "Start", textured_scene(0), [(0.5, 0.5)])
+    other = textured_scene(1)
+    cache.store("microwave", "Stop", other, [(0.25, 0.25)])
+
+    assert list(cache.index["microwave"]["functions"]) == ["Stop"]
+    assert_close(cache.lookup("microwave", "Stop", other)[0], (160, 120))
+
+def test_index_persists_across_instances(tmp_path):
+    scene = textured_scene()
+    TargetCache(str(tmp_path)).store("microwave", "Start", scene, [(0.5, 0.5)])
+
+    reopened = TargetCache(str(tmp_path))
+    assert_close(reopened.lookup("microwave", "Start", warped(scene))[0], warp_point((320, 240)))
+
+def test_map_points_uses_homography_or_scaling(tmp_path):
+    scene = textured_scene()
+    cache = TargetCache(str(tmp_path))
+    assert_close(cache.map_points([(0.5, 0.5)], scene, warped(scene))[0], warp_point((320, 240)))
+
+    # Unrelated views fall back to plain scaling to the new frame size
+    smaller = cv2.resize(textured_scene(1), (320, 240))
+    assert cache.map_points([(0.5, 0.25)], scene, smaller) == [(160, 60)]
@@ -0,0 +1,138 @@
+# test_task_scheduler.py
+
+import threading
+import time
+
+from task_scheduler import TaskCancelled, TaskDeadlineExceeded, TaskScheduler
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_latest_request_of_a_kind_wins():
+    scheduler = TaskScheduler(max_workers=1)
+    release = threading.Event()
+    started = []
+    results = []
+
+    def work(task, value):
+        started.append(value)
+        release.wait(2)
+        return value
+
+    scheduler.submit("detect", work, 0, on_result=results.append)
+    assert wait_for(lambda: started == [0])
+    for value in range(1, 4):
+        scheduler.submit("detect", work, value, on_result=results.append)
+    release.set()
+
+    assert wait_for(lambda: results == [3])
+    # The first call was already running; the queued ones in between never started
+    assert started == [0, 3]
+    scheduler.shutdown()
+
+def test_other_kinds_are_not_coalesced():
+    scheduler = TaskScheduler(max_workers=2)
+    results = []
+    scheduler.submit("detect", lambda task: "detected", on_result=results.append)
+    scheduler.submit("verify", lambda task: "verified", on_result=results.append)
+    assert wait_for(lambda: sorted(results) == ["detected", "verified"])
+    scheduler.shutdown()
+
+def test_cancel_all_drops_running_results():
+    scheduler = TaskScheduler(max_workers=1)
+    running = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def work(task):
+        running.set()
+        release.wait(2)
+        return "stale"
+
+    task = scheduler.submit("execute_step", work, on_result=results.append)
+    assert running.wait(2)
+    scheduler.cancel_all()
+    release.set()
+    assert wait_for(task.future.done)
+    assert results == []
+    scheduler.shutdown()
+
+def test_deadline_skips_late_tasks():
+    scheduler = TaskScheduler(max_workers=1)
+    release = threading.Event()
+    ran = []
+    scheduler.submit("verify", lambda task: release.wait(2))
+    late = scheduler.submit("detect", lambda task: ran.append(True), deadline=0.05)
+    time.sleep(0.1)
+    release.set()
+    assert wait_for(late.future.done)
+    assert ran == []
+    scheduler.shutdown()
+
+def test_deadline_misses_reach_on_error():
+    scheduler = TaskScheduler(max_workers=1)
+    release = threading.Event()
+    results, errors = [], []
+    scheduler.submit("verify", lambda task: release.wait(2))
+    # Never started before its deadline
+    scheduler.submit("detect", lambda task: "late", on_result=results.append, on_error=errors.append, deadline=0.05)
+    time.sleep(0.1)
+    release.set()
+    assert wait_for(lambda: len(errors) == 1)
+
+    # Started in time but finished too late
+    scheduler.submit("execute_step", lambda task: time.sleep(0.2) or "slow",
+                     on_result=results.append, on_error=errors.append, deadline=0.1)
+    assert wait_for(lambda: len(errors) == 2)
+    assert results == []
+    assert all(isinstance(e, TaskDeadlineExceeded) for e in errors)
+    scheduler.shutdown()
+
+def test_superseded_tasks_do_not_reach_on_error():
+    scheduler = TaskScheduler(max_workers=1)
+    release = threading.Event()
+    errors = []
+    first = scheduler.submit("detect", lambda task: release.wait(2) and task.check(), on_error=errors.append, deadline=0.05)
+    scheduler.submit("detect", lambda task: None)
+    time.sleep(0.1)
+    release.set()
+    assert wait_for(first.future.done)
+    assert errors == []
+    scheduler.shutdown()
+
+def test_errors_reach_on_error():
+    scheduler = TaskScheduler(max_workers=1)
+    errors = []
+
+    def fail(task):
+        raise ValueError("boom")
+
+    scheduler.submit("detect", fail, on_error=errors.append)
+    assert wait_for(lambda: len(errors) == 1)
+    assert isinstance(errors[0], ValueError)
+    scheduler.shutdown()
+
+def test_task_check_raises_once_superseded():
+    scheduler = TaskScheduler(max_workers=2)
+    running = threading.Event()
+    checked = threading.Event()
+    outcome = []
+
+    def work(task):
+        running.set()
+        checked.wait(2)
+        try:
+            task.check()
+        except TaskCancelled:
+            outcome.append("cancelled")
+            raise
+
+    scheduler.submit("execute_step", work)
+    assert running.wait(2)
+    scheduler.cancel("execute_step")
+    checked.set()
+    assert wait_for(lambda: outcome == ["cancelled"])
+    scheduler.shutdown()
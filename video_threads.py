@@ -1,26 +1,49 @@
 # video_threads.py
 
 import threading
+import time
 import cv2
-import mediapipe as mp
 import math
 from queue import Queue, Empty
-
-# Initialize MediaPipe solutions
-mp_drawing = mp.solutions.drawing_utils
-mp_hands = mp.solutions.hands
+from capture_source import CaptureSource
+from hand_state import HandAssociator
+from overlay import OverlayLayer
+from point_trackers import create_point_tracker
+from startup import mediapipe_solutions, startup_profile
 
 class HandTrackingThread(threading.Thread):
-    def __init__(self, frame_queue, shutdown_event):
+    def __init__(self, frame_queue, shutdown_event, max_num_hands=1):
         super().__init__()
         self.frame_queue = frame_queue
         self.latest_results = None
         self.results_lock = threading.Lock() 
         self.shutdown_event = shutdown_event
-        self.hands = mp_hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.7)
+        self.max_num_hands = max_num_hands
+        # The MediaPipe graph is built in run() so the window can appear first
+        self.hands = None
+
+    def _create_hands(self):
+        model_start = time.perf_counter()
+        mp_hands = mediapipe_solutions.get().hands
+        # In video mode the graph runs the landmark model on a region of
+        # interest derived from the previous frame's landmarks, and skips the
+        # palm detector only while max_num_hands hands are being tracked; with
+        # fewer hands in view it detects on every frame, so max_num_hands is
+        # kept at 1 unless several users really share the station. The ROI is
+        # kept in normalized coordinates, so the graph must always be given
+        # frames of the same geometry: full frames only, never crops.
+        hands = mp_hands.Hands(static_image_mode=False, max_num_hands=self.max_num_hands, min_detection_confidence=0.7)
+        startup_profile.record_background("hand tracking model", time.perf_counter() - model_start)
+        return hands
 
     def run(self):
         print("Hand tracking thread starts.")
+        try:
+            self.hands = self._create_hands()
+        except Exception as e:
+            print(f"Error in HandTrackingThread: failed to load MediaPipe: {e}")
+            return
+
         while not self.shutdown_event.is_set():
             try:
                 frame = self.frame_queue.get(timeout=0.05)
@@ -46,7 +69,8 @@ class HandTrackingThread(threading.Thread):
             return self.latest_results
 
 class VideoCaptureThread(threading.Thread):
-    def __init__(self, camera_source, interaction_queue, frame_queue, hand_tracking_thread, shutdown_event):
+    def __init__(self, camera_source, interaction_queue, frame_queue, hand_tracking_thread, shutdown_event, tracker_backend="template",
+                 loop_video=False):
         super().__init__()
         self.camera_source = camera_source
         self.interaction_queue = interaction_queue
@@ -59,16 +83,21 @@ class VideoCaptureThread(threading.Thread):
         self.tracker_lock = threading.Lock()
 
         self.trackers = []
+        self.tracker_backend = tracker_backend
+        self.target_box_fraction = 0.1  # Tracker box side as a fraction of the shorter frame side
+        self.min_target_box = 24
         self.dot_radius = 10
         self.dot_color = (0, 0, 255)
         self.touch_radius = 10
+        self.overlay = OverlayLayer(self.dot_radius, self.dot_color)
         
-        # New attributes for historical smoothing
-        self.thumb_tip_history = []
-        self.index_tip_history = []
+        # Per-hand state for historical smoothing, keyed by a stable hand ID
         self.history_size = 5  # Number of past frames to average
+        self.hand_associator = HandAssociator(history_size=self.history_size)
+        self.last_results = None
+        self.last_tracked_hands = []
         
-        self.cap = cv2.VideoCapture(self.camera_source)
+        self.cap = CaptureSource(self.camera_source, loop=loop_video)
     
     def run(self):
         if not self.cap.isOpened():
@@ -76,10 +105,14 @@ class VideoCaptureThread(threading.Thread):
             self.shutdown_event.set()
             return
         
+        self.cap.start()
         print("Video capture thread started.")
         while not self.shutdown_event.is_set():
             ret, frame = self.cap.read()
             if not ret:
+                if self.cap.live:
+                    # Live sources reconnect on their own; keep waiting for frames
+                    continue
                 print("Video stream ended, releasing camera.")
                 break
             
@@ -90,49 +123,36 @@ class VideoCaptureThread(threading.Thread):
 
             results = self.hand_thread.get_results()
 
-            tracker_centers = []
             with self.tracker_lock:
-                self._update_trackers(frame)
-                
-                for tracker in self.trackers:
-                    success, bbox = tracker.update(frame) 
-                    if success:
-                        center_x = int(bbox[0] + bbox[2] / 2)
-                        center_y = int(bbox[1] + bbox[3] / 2)
-                        tracker_centers.append((center_x, center_y))
+                tracker_centers = self._update_trackers(frame)
 
+            h, w, c = frame.shape
+            hand_overlays = []
             if results and results.multi_hand_landmarks:
-                for handLms in results.multi_hand_landmarks:
-                    # Draw landmarks on the frame
-                    mp_drawing.draw_landmarks(frame, handLms, mp_hands.HAND_CONNECTIONS)
-                    
-                    thumb_tip = handLms.landmark[4]
-                    index_tip = handLms.landmark[8]
-                    
-                    h, w, c = frame.shape
-                    
-                    # Get the raw finger point coordinates
-                    thumb_point_raw = (int(thumb_tip.x * w), int(thumb_tip.y * h))
-                    index_point_raw = (int(index_tip.x * w), int(index_tip.y * h))
-                    
-                    # Apply smoothing by updating history
-                    smoothed_thumb_point = self._update_history(self.thumb_tip_history, thumb_point_raw)
-                    smoothed_index_point = self._update_history(self.index_tip_history, index_point_raw)
+                tracked_hands = self._associate_hands(results, w, h)
+
+                for handLms, hand in zip(results.multi_hand_landmarks, tracked_hands):
+                    hand_overlays.append((hand.hand_id, handLms))
 
                     # Use the smoothed points for distance calculation
-                    finger_points = [smoothed_thumb_point, smoothed_index_point]
-
-                    for dot_center in tracker_centers:
-                        for finger_tip in finger_points:
-                            distance = math.dist(dot_center, finger_tip)
-                            if distance < self.touch_radius:
-                                self.interaction_queue.put("TOUCH_DETECTED")
-                                with self.tracker_lock:
-                                    self.trackers = []
-                                break
-                        else: continue
-                        break
+                    finger_points = [hand.smoothed_thumb, hand.smoothed_index]
+
+                    touched = self._find_touch(tracker_centers, finger_points)
+                    if touched:
+                        dot_center, finger_tip = touched
+                        self.interaction_queue.put({
+                            "type": "TOUCH_DETECTED",
+                            "hand_id": hand.hand_id,
+                            "handedness": hand.handedness,
+                            "point": finger_tip,
+                            "target": dot_center,
+                        })
+                        with self.tracker_lock:
+                            self.trackers = []
+                        tracker_centers = []
             
+            # Annotations are drawn later on the display image; the frame stays clean
+            self.overlay.update((w, h), tracker_centers, hand_overlays)
             with self.frame_lock:
                 self.frame = frame
         
@@ -140,34 +160,53 @@ class VideoCaptureThread(threading.Thread):
             self.cap.release()
         print("The video capture thread stops.")
 
-    def get_frame(self):
+    def get_source_stats(self):
+        """Measured source FPS, dropped frames and connection state, see CaptureSource.stats()."""
+        return self.cap.stats()
+
+    def get_frame(self, copy=True):
+        # The published frame is never drawn on, so display code may read it without copying
         with self.frame_lock:
-            return self.frame.copy() if self.frame is not None else None
+            if self.frame is None:
+                return None
+            return self.frame.copy() if copy else self.frame
             
     def _update_trackers(self, frame): 
         updated_trackers = []
+        tracker_centers = []
         if not self.trackers:
-            return
+            return tracker_centers
         
         for tracker in self.trackers:
+            was_lost = tracker.is_lost()
             success, bbox = tracker.update(frame)
             if success:
                 center_x = int(bbox[0] + bbox[2] / 2)
                 center_y = int(bbox[1] + bbox[3] / 2)
-                cv2.circle(frame, (center_x, center_y), self.dot_radius, self.dot_color, -1)
+                tracker_centers.append((center_x, center_y))
                 updated_trackers.append(tracker)
+            elif tracker.is_expired():
+                print("Tracking failed for one point, target could not be re-acquired.")
             else:
-                print("Tracking failed for one point.")
+                if not was_lost:
+                    print("Tracking lost for one point, searching for it...")
+                updated_trackers.append(tracker)
         self.trackers = updated_trackers
+        return tracker_centers
 
     def create_trackers(self, points, frame):
+        h, w = frame.shape[:2]
+        box_size = max(self.min_target_box, int(min(w, h) * self.target_box_fraction))
+        half = box_size // 2
+
         new_trackers = []
         for point in points:
             x, y = point
-            bbox = (max(0, x - 50), max(0, y - 50), 100, 100) 
+            # Keep the whole box inside the frame so the template is never clipped
+            bbox = (min(max(0, x - half), w - box_size), min(max(0, y - half), h - box_size), box_size, box_size)
             
-            tracker = cv2.TrackerKCF_create()
             try:
+                tracker = create_point_tracker(self.tracker_backend)
                 tracker.init(frame, bbox)
                 new_trackers.append(tracker)
             except Exception as e:
@@ -176,17 +215,35 @@ class VideoCaptureThread(threading.Thread):
         with self.tracker_lock:
             self.trackers = new_trackers
 
-    # New method to manage the historical data and calculate the average for smoothing.
-    def _update_history(self, history, new_point):
-        """Adds a new point to the history and returns the smoothed average."""
-        history.append(new_point)
-        
-        # Keep the history list at a fixed size by removing the oldest element if it's too long
-        if len(history) > self.history_size:
-            history.pop(0)
-        
-        # Calculate the average of all points in the history
-        avg_x = sum(p[0] for p in history) / len(history)
-        avg_y = sum(p[1] for p in history) / len(history)
-        
-        return (int(avg_x), int(avg_y))
\ No newline at end of file
+    def _associate_hands(self, results, w, h):
+        """Matches the detected hands to their tracked state and updates per-hand smoothing."""
+        if results is self.last_results:
+            # The hand thread has not produced new landmarks since the last frame
+            return self.last_tracked_hands
+
+        centers = [(handLms.landmark[0].x, handLms.landmark[0].y) for handLms in results.multi_hand_landmarks]
+        tracked_hands = self.hand_associator.update(centers)
+
+        handedness = results.multi_handedness or []
+        for i, (handLms, hand) in enumerate(zip(results.multi_hand_landmarks, tracked_hands)):
+            if i < len(handedness):
+                hand.handedness = handedness[i].classification[0].label
+
+            thumb_tip = handLms.landmark[4]
+            index_tip = handLms.landmark[8]
+
+            # Get the raw finger point coordinates
+            thumb_point_raw = (int(thumb_tip.x * w), int(thumb_tip.y * h))
+            index_point_raw = (int(index_tip.x * w), int(index_tip.y * h))
+            hand.update_fingertips(thumb_point_raw, index_point_raw)
+
+        self.last_results = results
+        self.last_tracked_hands = tracked_hands
+        return tracked_hands
+
+    def _find_touch(self, tracker_centers, finger_points):
+        for dot_center in tracker_centers:
+            for finger_tip in finger_points:
+                if math.dist(dot_center, finger_tip) < self.touch_radius:
+                    return dot_center, finger_tip
+        return None